@@ -22,6 +22,8 @@ from dataclasses import dataclass, asdict
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 # Import from sibling module
@@ -107,6 +109,9 @@ class ChatSentimentAnalyzer:
         'gg', 'glhf', 'gl'
     ]
 
+    # Most texts AWS Comprehend accepts in one BatchDetectSentiment call
+    AWS_BATCH_SIZE = 25
+
     def __init__(self, region: str = "us-east-1", use_aws: bool = True):
         self.region = region
         self.use_aws = use_aws and AWS_AVAILABLE
@@ -140,6 +145,45 @@ class ChatSentimentAnalyzer:
             logger.warning(f"AWS Comprehend error: {e}")
             return self._analyze_sentiment_fallback(text)
 
+    def _analyze_sentiment_aws_batch(self, texts: List[str]) -> List[SentimentScore]:
+        """Analyze many texts with AWS Comprehend, AWS_BATCH_SIZE per request."""
+        results: List[Optional[SentimentScore]] = [None] * len(texts)
+
+        # Comprehend rejects empty text, so those are neutral without a request
+        pending = []
+        for i, text in enumerate(texts):
+            if text.strip():
+                pending.append(i)
+            else:
+                results[i] = SentimentScore(0, 0, 1, 0, "NEUTRAL")
+
+        for start in range(0, len(pending), self.AWS_BATCH_SIZE):
+            batch = pending[start:start + self.AWS_BATCH_SIZE]
+            try:
+                response = self.comprehend.batch_detect_sentiment(
+                    TextList=[texts[i] for i in batch],
+                    LanguageCode='en'
+                )
+            except ClientError as e:
+                logger.warning(f"AWS Comprehend error: {e}")
+                response = {'ResultList': [], 'ErrorList': []}
+
+            for item in response['ResultList']:
+                scores = item['SentimentScore']
+                results[batch[item['Index']]] = SentimentScore(
+                    positive=scores['Positive'],
+                    negative=scores['Negative'],
+                    neutral=scores['Neutral'],
+                    mixed=scores['Mixed'],
+                    dominant=item['Sentiment']
+                )
+
+        # Texts that failed (per item or per request) use the keyword analysis
+        return [
+            result if result is not None else self._analyze_sentiment_fallback(text)
+            for text, result in zip(texts, results)
+        ]
+
     def _analyze_sentiment_fallback(self, text: str) -> SentimentScore:
         """Fallback keyword-based sentiment analysis."""
         text_lower = text.lower()
@@ -178,6 +222,24 @@ class ChatSentimentAnalyzer:
             return self._analyze_sentiment_aws(text)
         return self._analyze_sentiment_fallback(text)
 
+    def analyze_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Analyze sentiment of many texts at once.
+
+        Returns:
+            float64 array of shape (len(texts), 3) holding the positive,
+            negative and neutral score of each text
+        """
+        if self.use_aws:
+            sentiments = self._analyze_sentiment_aws_batch(texts)
+        else:
+            sentiments = [self._analyze_sentiment_fallback(text) for text in texts]
+
+        scores = np.empty((len(sentiments), 3), dtype=np.float64)
+        for i, sentiment in enumerate(sentiments):
+            scores[i] = (sentiment.positive, sentiment.negative, sentiment.neutral)
+        return scores
+
     def analyze_match_chat(self, match_id: str) -> MatchChatSentimentSummary:
         """
         Analyze all chat messages for a match.
@@ -42,3 +42,18 @@ class Connect():
         except Exception as e:
             logger.error(e)
             raise
+
+    def execute_rows(self, sql:str, params:dict = {}):
+        """
+        Executes a SQL query via SQLAlchemy Engine and yields its rows, without
+        building a Pandas dataframe
+        :param sql: SQL query as a string to be executed
+        :param params: Dict storing strings to be safely passed to query
+        :return: Generator of SQLAlchemy Rows, columns accessible as attributes
+        """
+        try:
+            with self.connection.connect() as connection:
+                yield from connection.execute(text(sql),params)
+        except Exception as e:
+            logger.error(e)
+            raise
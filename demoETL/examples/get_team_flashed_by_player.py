@@ -23,9 +23,10 @@ def get_team_flashed_by_player(demoparser):
     # Get team number by player
     team_df = demoparser.parse_event("player_team")[['team','user_steamid']].set_index('user_steamid')
 
-    # get all flashbang events and filter out warmup
+    # get all flashbang events and filter out warmup, keeping only the columns
+    # used below so the merges don't carry every parsed event column along
     all_flashed_events_df = demoparser.parse_event("player_blind", other=["is_warmup_period"])
-    flashed_events_df     = all_flashed_events_df[all_flashed_events_df["is_warmup_period"] == False]
+    flashed_events_df     = all_flashed_events_df.loc[~all_flashed_events_df["is_warmup_period"], ['user_steamid','attacker_steamid','attacker_name','blind_duration']]
 
     # Join in the flashee team and flasher team sequentially
     flashes_w_user_team_df = flashed_events_df.merge(team_df, on='user_steamid')
@@ -35,7 +36,10 @@ def get_team_flashed_by_player(demoparser):
     team_flashes_df = flashes_w_both_team_df[flashes_w_both_team_df["team_user"]==flashes_w_both_team_df["team_attacker"]]
 
     # Aggregate
-    team_flash_leaderboard_df = team_flashes_df[['attacker_name','team_attacker','blind_duration']].groupby(['attacker_name','team_attacker']).agg(['count','sum'])
+    team_flash_leaderboard_df = team_flashes_df.groupby(['attacker_name','team_attacker']).agg(
+         team_flash_count=('blind_duration','count')
+        ,blind_duration_sec_sum=('blind_duration','sum')
+    )
 
     end = time.time()
 
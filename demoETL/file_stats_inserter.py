@@ -16,12 +16,225 @@ Usage:
 import hashlib
 import logging as logger
 import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime
 from typing import Optional
+import numpy as np
+import pandas as pd
+import polars as pl
 from demoparser2 import DemoParser
 from file_storage import FileStorage
 from voice_extractor import VoiceExtractor, VoiceExtractionResult
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.info("numba not installed. Clutch scan will run in pure Python.")
+
+# Worker threads used by insert_all for the independent stat inserters
+INSERT_WORKERS = 6
+
+# Worker threads used by insert_all to run the demo parses side by side
+PARSE_WORKERS = 4
+
+# Ticks after the last round_end searched for the final scoreboard (two
+# minutes at 64 tick); demos running longer fall back to a full tick parse
+SCOREBOARD_TAIL_TICKS = 64 * 120
+
+# Marks a parse cache that has not been filled yet (None means "parsed, no data")
+_NOT_PARSED = object()
+
+# Steam ID columns emitted by demoparser2 events
+STEAMID_COLUMNS = ('attacker_steamid', 'user_steamid', 'assister_steamid')
+
+
+def _normalize_steamid_columns(df):
+    """
+    Coerce Steam ID columns to plain strings once, with missing IDs as ''.
+
+    Done at parse time so the insert_* loops and groupbys can use the
+    columns directly instead of calling str() per row.
+    """
+    if df is None or len(df) == 0:
+        return df
+    for col in STEAMID_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna('').astype(str)
+    return df
+
+
+# Columns consumed from list-shaped parser output; everything else is dropped
+ROUND_COLUMNS = ('round', 'tick', 'winner', 'reason')
+PLAYER_TEAM_COLUMNS = ('team', 'user_steamid', 'user_name')
+FLASH_COLUMNS = ('tick', 'attacker_steamid', 'attacker_name', 'user_steamid', 'blind_duration')
+
+
+def _records_to_frame(records, columns):
+    """
+    Build a DataFrame column-wise from a list of event dicts, keeping only
+    the requested columns that the events actually carry.
+    """
+    if not records:
+        return pd.DataFrame()
+    present = [col for col in columns if col in records[0]]
+    return pd.DataFrame({col: [record.get(col) for record in records] for col in present})
+
+
+# Low-cardinality string columns stored as category so groupby/merge hash
+# small integer codes instead of repeated strings. The Steam ID columns share
+# one set of categories so attacker/victim/assister codes line up and the
+# columns can be compared with each other directly.
+CATEGORY_COLUMNS = ('weapon',)
+
+
+def _categorize_columns(df):
+    """Convert the repeated Steam ID / weapon string columns to category dtype."""
+    if df is None or len(df) == 0:
+        return df
+
+    steamid_cols = [col for col in STEAMID_COLUMNS if col in df.columns]
+    if steamid_cols:
+        steam_ids = pd.unique(np.concatenate([df[col].to_numpy(object) for col in steamid_cols]))
+        steamid_dtype = pd.CategoricalDtype(steam_ids)
+        for col in steamid_cols:
+            df[col] = df[col].astype(steamid_dtype)
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def _normalize_tick_column(df):
+    """Cast the tick column to int64 once so readers can use it as-is."""
+    if df is not None and 'tick' in df.columns:
+        df['tick'] = df['tick'].fillna(0).astype('int64')
+    return df
+
+
+def _prepare_event_df(df):
+    """Normalize Steam IDs and ticks and categorize repeated columns of a parsed event frame."""
+    return _categorize_columns(_normalize_tick_column(_normalize_steamid_columns(df)))
+
+
+@lru_cache(maxsize=4096)
+def _match_id_for(filename: str) -> str:
+    """
+    Match ID for a demo filename. The hash is only an identifier, not a
+    security primitive; it stays MD5 so IDs already stored in the tables
+    (and StatsInserter's) keep matching.
+    """
+    return hashlib.md5(filename.encode()).hexdigest()[:16]
+
+
+def _column(df, name, default=None, dtype=object):
+    """Values of df[name] as an array, or default repeated if the column is missing."""
+    if name in df.columns:
+        return df[name].to_numpy(dtype)
+    return np.full(len(df), default, dtype=dtype)
+
+
+def _sort_by_tick(df):
+    """
+    Return df in tick order with a fresh positional index. Stable, so events
+    on the same tick keep the parser's order; already-sorted frames are
+    returned without copying.
+    """
+    if df is None or len(df) == 0 or 'tick' not in df.columns:
+        return df
+    if df['tick'].is_monotonic_increasing:
+        return df.reset_index(drop=True)
+    return df.sort_values('tick', kind='stable', ignore_index=True)
+
+
+def _scan_clutches(victim_ids, round_of_kill, player_team_codes, n_teams):
+    """
+    Replay kills in tick order and record every 1vX moment.
+
+    victim_ids are positions into player_team_codes (-1 for unknown victims)
+    and round_of_kill is the 0-based round of each kill. Everyone is alive at
+    the start of a round; after each kill, if exactly two teams are left, the
+    last player standing on a team is recorded with the enemy count. Returns
+    parallel (round, player, enemies_alive) arrays in the order found.
+    """
+    n_players = len(player_team_codes)
+    max_out = 2 * len(victim_ids)
+    out_round = np.empty(max_out, np.int64)
+    out_player = np.empty(max_out, np.int64)
+    out_enemies = np.empty(max_out, np.int64)
+    n_out = 0
+
+    alive = np.ones(n_players, np.bool_)
+    team_alive = np.zeros(n_teams, np.int64)
+    current_round = -1
+
+    for k in range(len(victim_ids)):
+        round_idx = round_of_kill[k]
+        if round_idx != current_round:
+            current_round = round_idx
+            alive[:] = True
+            team_alive[:] = 0
+            for p in range(n_players):
+                team_alive[player_team_codes[p]] += 1
+
+        victim = victim_ids[k]
+        if victim >= 0 and alive[victim]:
+            alive[victim] = False
+            team_alive[player_team_codes[victim]] -= 1
+
+        teams_left = 0
+        total_alive = 0
+        for t in range(n_teams):
+            if team_alive[t] > 0:
+                teams_left += 1
+                total_alive += team_alive[t]
+        if teams_left != 2:
+            continue
+
+        # Walk players in roster order so lone players are emitted in the
+        # order their teams are first seen
+        for p in range(n_players):
+            if alive[p] and team_alive[player_team_codes[p]] == 1:
+                out_round[n_out] = round_idx
+                out_player[n_out] = p
+                out_enemies[n_out] = total_alive - 1
+                n_out += 1
+
+    return out_round[:n_out], out_player[:n_out], out_enemies[:n_out]
+
+
+def _bucket_multikills(kill_counts, player_codes, n_players):
+    """
+    Tally per-(round, player) kill counts into per-player double, triple,
+    quad and ace counts. player_codes index each count's player.
+    """
+    doubles = np.zeros(n_players, np.int64)
+    triples = np.zeros(n_players, np.int64)
+    quads = np.zeros(n_players, np.int64)
+    aces = np.zeros(n_players, np.int64)
+    for i in range(kill_counts.size):
+        count = kill_counts[i]
+        player = player_codes[i]
+        if count == 2:
+            doubles[player] += 1
+        elif count == 3:
+            triples[player] += 1
+        elif count == 4:
+            quads[player] += 1
+        elif count >= 5:
+            aces[player] += 1
+    return doubles, triples, quads, aces
+
+
+if NUMBA_AVAILABLE:
+    _scan_clutches = njit(cache=True)(_scan_clutches)
+    _bucket_multikills = njit(cache=True)(_bucket_multikills)
+
 
 class FileStatsInserter:
     """
@@ -47,107 +260,324 @@ class FileStatsInserter:
         # Generate a unique match_id from the demo filename
         self.match_id = self._generate_match_id(demo_filename)
 
-        # Cache parsed data
-        self._header = None
-        self._rounds_df = None
-        self._kills_df = None
-        self._scoreboard_df = None
-        self._damage_df = None
-        self._flash_events_df = None
-        self._player_teams_df = None
-        self._weapon_fire_df = None
+        # One timestamp for everything this inserter writes
+        self._now_iso = datetime.now().isoformat()
+
+        # Cache parsed data; None is a cached "no data" result, so failed or
+        # empty parses are not retried by every insert_* method
+        self._header = _NOT_PARSED
+        self._rounds_df = _NOT_PARSED
+        self._kills_df = _NOT_PARSED
+        self._scoreboard_df = _NOT_PARSED
+        self._damage_df = _NOT_PARSED
+        self._flash_events_df = _NOT_PARSED
+        self._player_teams_df = _NOT_PARSED
+        self._weapon_fire_df = _NOT_PARSED
+        self._damage_enriched_df = _NOT_PARSED
+        self._flash_enriched_df = _NOT_PARSED
+        self._round_kills_pl = _NOT_PARSED
+        self._round_stats = _NOT_PARSED
+        self._chat_df = _NOT_PARSED
+        self._attacker_kills_df = _NOT_PARSED
+        self._round_tick_arrays = _NOT_PARSED
+        # One lock per cache so concurrent insert_* calls parse each event once
+        self._parse_locks = {name: threading.RLock() for name in (
+            '_header', '_rounds_df', '_kills_df', '_scoreboard_df', '_damage_df',
+            '_flash_events_df', '_player_teams_df', '_weapon_fire_df',
+            '_damage_enriched_df', '_flash_enriched_df', '_round_kills_pl', '_round_stats',
+            '_chat_df', '_attacker_kills_df', '_round_tick_arrays'
+        )}
 
     def _generate_match_id(self, filename: str) -> str:
         """Generate a unique match ID from the demo filename."""
-        return hashlib.md5(filename.encode()).hexdigest()[:16]
+        return _match_id_for(filename)
 
     def _parse_header(self) -> dict:
-        if self._header is None:
-            self._header = self.parser.parse_header()
+        with self._parse_locks['_header']:
+            if self._header is _NOT_PARSED:
+                self._header = self.parser.parse_header()
         return self._header
 
     def _parse_rounds(self):
-        if self._rounds_df is None:
-            result = self.parser.parse_event("round_end")
-            # Convert list to DataFrame if necessary
-            if isinstance(result, list):
-                import pandas as pd
-                self._rounds_df = pd.DataFrame(result) if result else pd.DataFrame()
-            else:
-                self._rounds_df = result
+        with self._parse_locks['_rounds_df']:
+            if self._rounds_df is _NOT_PARSED:
+                result = self.parser.parse_event("round_end")
+                # Convert list to DataFrame if necessary
+                if isinstance(result, list):
+                    self._rounds_df = _records_to_frame(result, ROUND_COLUMNS)
+                else:
+                    # Positional index so round numbers are always index + 1
+                    self._rounds_df = result.reset_index(drop=True)
 
-            # Log if we got empty rounds
-            if len(self._rounds_df) == 0:
-                logger.warning(f"No round_end events found in demo - this may be a partial or incomplete demo")
+                # Log if we got empty rounds
+                if len(self._rounds_df) == 0:
+                    logger.warning(f"No round_end events found in demo - this may be a partial or incomplete demo")
         return self._rounds_df
 
     def _parse_kills(self):
-        if self._kills_df is None:
-            self._kills_df = self.parser.parse_event("player_death")
+        with self._parse_locks['_kills_df']:
+            if self._kills_df is _NOT_PARSED:
+                self._kills_df = _sort_by_tick(_prepare_event_df(self.parser.parse_event("player_death")))
         return self._kills_df
 
+    def _parse_attacker_kills(self):
+        """
+        Kills credited to a player, i.e. with a populated attacker_steamid
+        (cached). World/bot kills stay in _parse_kills() because the kills
+        table, clutch replay and first-blood detection all need them.
+        """
+        with self._parse_locks['_attacker_kills_df']:
+            if self._attacker_kills_df is _NOT_PARSED:
+                kills_df = self._parse_kills()
+                if kills_df is not None and 'attacker_steamid' in kills_df.columns:
+                    kills_df = kills_df[kills_df['attacker_steamid'] != '']
+                self._attacker_kills_df = kills_df
+        return self._attacker_kills_df
+
     def _parse_scoreboard(self):
-        if self._scoreboard_df is None:
-            props = [
-                "kills_total", "deaths_total", "assists_total",
-                "headshot_kills_total", "damage_total", "score", "mvps",
-                "team_name"
-            ]
-            ticks_df = self.parser.parse_ticks(props)
-            if 'tick' in ticks_df.columns and len(ticks_df) > 0:
-                last_tick = ticks_df['tick'].max()
-                self._scoreboard_df = ticks_df[ticks_df['tick'] == last_tick]
-            else:
-                self._scoreboard_df = ticks_df
+        with self._parse_locks['_scoreboard_df']:
+            if self._scoreboard_df is _NOT_PARSED:
+                props = [
+                    "kills_total", "deaths_total", "assists_total",
+                    "headshot_kills_total", "damage_total", "score", "mvps",
+                    "team_name"
+                ]
+                ticks_df = self._parse_final_ticks(props)
+                if 'steamid' in ticks_df.columns:
+                    ticks_df['steamid'] = ticks_df['steamid'].fillna('').astype(str)
+                if 'tick' in ticks_df.columns and len(ticks_df) > 0:
+                    last_tick = ticks_df['tick'].max()
+                    self._scoreboard_df = ticks_df[ticks_df['tick'] == last_tick]
+                else:
+                    self._scoreboard_df = ticks_df
         return self._scoreboard_df
 
+    def _parse_final_ticks(self, props):
+        """
+        Parse props only over a window of ticks after the last round_end
+        instead of the whole demo. Player rows exist on every tick, so if the
+        window's last tick is missing the demo ended inside the window and
+        its final tick is the demo's; otherwise every tick is parsed.
+        """
+        rounds_df = self._parse_rounds()
+        if 'tick' in rounds_df.columns and len(rounds_df) > 0:
+            window_start = int(rounds_df['tick'].max())
+            window_end = window_start + SCOREBOARD_TAIL_TICKS
+            try:
+                ticks_df = self.parser.parse_ticks(props, ticks=list(range(window_start, window_end)))
+                if 'tick' in ticks_df.columns and len(ticks_df) > 0 and ticks_df['tick'].max() < window_end - 1:
+                    return ticks_df
+            except Exception as e:
+                logger.warning(f"Could not parse final ticks, parsing all ticks: {e}")
+        return self.parser.parse_ticks(props)
+
     def _parse_damage(self):
-        if self._damage_df is None:
-            self._damage_df = self.parser.parse_event("player_hurt")
+        with self._parse_locks['_damage_df']:
+            if self._damage_df is _NOT_PARSED:
+                self._damage_df = _prepare_event_df(self.parser.parse_event("player_hurt"))
         return self._damage_df
 
     def _parse_player_teams(self):
-        if self._player_teams_df is None:
-            try:
-                team_df = self.parser.parse_event("player_team")
-                if isinstance(team_df, list):
-                    import pandas as pd
-                    team_df = pd.DataFrame(team_df) if team_df else pd.DataFrame()
-                if len(team_df) > 0:
-                    self._player_teams_df = team_df[['team', 'user_steamid', 'user_name']].drop_duplicates(
-                        subset=['user_steamid'], keep='last'
-                    ).set_index('user_steamid')
-            except Exception as e:
-                logger.warning(f"Could not parse player teams: {e}")
+        with self._parse_locks['_player_teams_df']:
+            if self._player_teams_df is _NOT_PARSED:
                 self._player_teams_df = None
+                try:
+                    team_df = self.parser.parse_event("player_team")
+                    if isinstance(team_df, list):
+                        team_df = _records_to_frame(team_df, PLAYER_TEAM_COLUMNS)
+                    if len(team_df) > 0:
+                        self._player_teams_df = team_df[['team', 'user_steamid', 'user_name']].drop_duplicates(
+                            subset=['user_steamid'], keep='last'
+                        ).set_index('user_steamid')
+                except Exception as e:
+                    logger.warning(f"Could not parse player teams: {e}")
         return self._player_teams_df
 
     def _parse_flash_events(self):
-        if self._flash_events_df is None:
-            try:
-                result = self.parser.parse_event("player_blind")
-                if isinstance(result, list):
-                    if len(result) > 0:
-                        import pandas as pd
-                        self._flash_events_df = pd.DataFrame(result)
+        with self._parse_locks['_flash_events_df']:
+            if self._flash_events_df is _NOT_PARSED:
+                try:
+                    result = self.parser.parse_event("player_blind")
+                    if isinstance(result, list):
+                        if len(result) > 0:
+                            self._flash_events_df = _prepare_event_df(_records_to_frame(result, FLASH_COLUMNS))
+                        else:
+                            self._flash_events_df = None
                     else:
-                        self._flash_events_df = None
-                else:
-                    self._flash_events_df = result if len(result) > 0 else None
-            except Exception as e:
-                logger.warning(f"Could not parse flash events: {e}")
-                self._flash_events_df = None
+                        self._flash_events_df = _prepare_event_df(result) if len(result) > 0 else None
+                except Exception as e:
+                    logger.warning(f"Could not parse flash events: {e}")
+                    self._flash_events_df = None
         return self._flash_events_df
 
     def _parse_weapon_fire(self):
-        if self._weapon_fire_df is None:
-            try:
-                self._weapon_fire_df = self.parser.parse_event("weapon_fire")
-            except Exception as e:
-                logger.warning(f"Could not parse weapon fire: {e}")
-                self._weapon_fire_df = None
+        with self._parse_locks['_weapon_fire_df']:
+            if self._weapon_fire_df is _NOT_PARSED:
+                try:
+                    self._weapon_fire_df = _prepare_event_df(self.parser.parse_event("weapon_fire"))
+                except Exception as e:
+                    logger.warning(f"Could not parse weapon fire: {e}")
+                    self._weapon_fire_df = None
         return self._weapon_fire_df
 
+    def _parse_chat_messages(self):
+        with self._parse_locks['_chat_df']:
+            if self._chat_df is _NOT_PARSED:
+                try:
+                    self._chat_df = _normalize_tick_column(
+                        _normalize_steamid_columns(self.parser.parse_event("chat_message"))
+                    )
+                except Exception as e:
+                    logger.warning(f"Could not parse chat messages: {e}")
+                    self._chat_df = None
+        return self._chat_df
+
+    def _get_player_names(self) -> dict:
+        """Map of steam_id -> player name from the player_team events."""
+        team_df = self._parse_player_teams()
+        return team_df['user_name'].to_dict() if team_df is not None else {}
+
+    def _get_round_bounds(self):
+        """
+        Return (start_ticks, end_ticks) arrays, one entry per round_end event.
+
+        A round runs from the previous round_end tick (0 for the first round)
+        up to, but not including, its own round_end tick.
+        """
+        rounds_df = self._parse_rounds()
+        if 'tick' in rounds_df.columns:
+            end_ticks = rounds_df['tick'].to_numpy(np.float64)
+        else:
+            end_ticks = np.full(len(rounds_df), np.inf)
+        start_ticks = np.empty_like(end_ticks)
+        if len(end_ticks) > 0:
+            start_ticks[0] = 0
+            start_ticks[1:] = end_ticks[:-1]
+        return start_ticks, end_ticks
+
+    def _get_round_tick_arrays(self):
+        """
+        Return (round_end_ticks, round_nums) for mapping ticks to round
+        numbers (cached). round_end_ticks is sorted; round_nums has a leading
+        1 for ticks before the first round_end, so the round of tick t is
+        round_nums[np.searchsorted(round_end_ticks, t, 'right')].
+        """
+        with self._parse_locks['_round_tick_arrays']:
+            if self._round_tick_arrays is _NOT_PARSED:
+                rounds_df = self._parse_rounds()
+                if len(rounds_df) > 0:
+                    round_end_ticks = rounds_df['tick'].to_numpy(np.int64)
+                    round_nums = (rounds_df['round'].to_numpy(np.int64) if 'round' in rounds_df.columns
+                                  else np.zeros(len(rounds_df), np.int64))
+                    order = np.argsort(round_end_ticks, kind='stable')
+                    self._round_tick_arrays = (round_end_ticks[order], np.concatenate(([1], round_nums[order])))
+                else:
+                    self._round_tick_arrays = (np.empty(0, np.int64), np.ones(1, np.int64))
+        return self._round_tick_arrays
+
+    def _join_team_info(self, events_df, team_df):
+        """Attach victim and attacker team/name lookups to an event frame."""
+        with_victim_team = events_df.merge(
+            team_df[['team', 'user_name']],
+            left_on='user_steamid',
+            right_index=True,
+            how='left',
+            suffixes=('', '_victim')
+        ).rename(columns={'team': 'victim_team', 'user_name': 'victim_name_lookup'})
+
+        return with_victim_team.merge(
+            team_df[['team', 'user_name']],
+            left_on='attacker_steamid',
+            right_index=True,
+            how='left'
+        ).rename(columns={'team': 'attacker_team', 'user_name': 'attacker_name_lookup'})
+
+    def _parse_damage_enriched(self):
+        """Damage events joined with attacker/victim team info (cached)."""
+        with self._parse_locks['_damage_enriched_df']:
+            if self._damage_enriched_df is _NOT_PARSED:
+                self._damage_enriched_df = None
+                damage_df = self._parse_damage()
+                team_df = self._parse_player_teams()
+                if damage_df is not None and len(damage_df) > 0 and team_df is not None and len(team_df) > 0:
+                    self._damage_enriched_df = self._join_team_info(damage_df, team_df)
+        return self._damage_enriched_df
+
+    def _parse_flash_enriched(self):
+        """Flash events joined with attacker/victim team info (cached)."""
+        with self._parse_locks['_flash_enriched_df']:
+            if self._flash_enriched_df is _NOT_PARSED:
+                self._flash_enriched_df = None
+                flash_df = self._parse_flash_events()
+                team_df = self._parse_player_teams()
+                if flash_df is not None and len(flash_df) > 0 and team_df is not None and len(team_df) > 0:
+                    self._flash_enriched_df = self._join_team_info(flash_df, team_df)
+        return self._flash_enriched_df
+
+    def _parse_round_kills(self):
+        """
+        Kills that fall inside a round as a Polars frame (cached).
+
+        Columns: round (0-based), tick, attacker_steamid, user_steamid, in tick
+        order. Kills after the last round end are dropped.
+        """
+        with self._parse_locks['_round_kills_pl']:
+            if self._round_kills_pl is _NOT_PARSED:
+                self._round_kills_pl = None
+                kills_df = self._parse_kills()
+                if kills_df is not None and len(kills_df) > 0:
+                    _, end_ticks = self._get_round_bounds()
+                    ticks = kills_df['tick'].to_numpy(np.float64)
+                    # Kills are tick-sorted, so the in-round kills are a prefix
+                    n_in_round = int(np.searchsorted(ticks, end_ticks[-1], 'left')) if len(end_ticks) > 0 else 0
+                    self._round_kills_pl = pl.DataFrame({
+                        'round': np.searchsorted(end_ticks, ticks[:n_in_round], 'right'),
+                        'tick': ticks[:n_in_round],
+                        'attacker_steamid': kills_df['attacker_steamid'].to_numpy(str)[:n_in_round],
+                        'user_steamid': kills_df['user_steamid'].to_numpy(str)[:n_in_round],
+                    })
+        return self._round_kills_pl
+
+    def _compute_round_stats(self):
+        """
+        Per-round kill aggregates shared by the multikill and first-blood
+        stats, computed together in one pass over the in-round kills (cached).
+
+        Returns (kill_counts, firsts):
+            kill_counts: kills per (round, attacker_steamid), in round order
+            firsts: attacker/victim Steam IDs of each round's opening kill
+        """
+        with self._parse_locks['_round_stats']:
+            if self._round_stats is _NOT_PARSED:
+                self._round_stats = None
+                round_kills = self._parse_round_kills()
+                if round_kills is not None:
+                    round_kills = round_kills.lazy()
+
+                    # World/bot kills without an attacker are dropped
+                    kill_counts = (
+                        round_kills
+                        .filter(pl.col('attacker_steamid') != '')
+                        .sort('round', maintain_order=True)
+                        .group_by(['round', 'attacker_steamid'], maintain_order=True)
+                        .agg(pl.count().alias('kills'))
+                    )
+
+                    # Earliest tick, first in kill order on ties; rounds opened
+                    # by a world/bot kill don't count for anyone
+                    firsts = (
+                        round_kills
+                        .filter(pl.col('tick') == pl.col('tick').min().over('round'))
+                        .group_by('round', maintain_order=True)
+                        .first()
+                        .sort('round')
+                        .filter(pl.col('attacker_steamid') != '')
+                        .select(['attacker_steamid', 'user_steamid'])
+                    )
+
+                    self._round_stats = tuple(pl.collect_all([kill_counts, firsts]))
+        return self._round_stats
+
     def insert_match(self) -> bool:
         """Insert match metadata."""
         header = self._parse_header()
@@ -159,19 +589,16 @@ class FileStatsInserter:
         t_score = 0
         valid_rounds = rounds_df  # Initialize valid_rounds
 
-        if hasattr(rounds_df, 'iterrows'):
+        if isinstance(rounds_df, pd.DataFrame):
             valid_rounds = rounds_df[rounds_df['winner'].notna()] if 'winner' in rounds_df.columns else rounds_df
-            for _, row in valid_rounds.iterrows():
-                winner = row.get('winner')
-                if winner == 3 or winner == 'CT':
-                    ct_score += 1
-                elif winner == 2 or winner == 'T':
-                    t_score += 1
+            winners = _column(valid_rounds, 'winner')
+            ct_score = int(((winners == 3) | (winners == 'CT')).sum())
+            t_score = int(((winners == 2) | (winners == 'T')).sum())
 
         winning_side = 'CT' if ct_score > t_score else ('T' if t_score > ct_score else None)
 
         # Get match date from demo file modification time
-        played_at = datetime.now().isoformat()
+        played_at = self._now_iso
         if self.demo_path and os.path.exists(self.demo_path):
             file_mtime = os.path.getmtime(self.demo_path)
             played_at = datetime.fromtimestamp(file_mtime).isoformat()
@@ -187,7 +614,8 @@ class FileStatsInserter:
             'total_rounds': len(valid_rounds) if hasattr(valid_rounds, '__len__') else 0,
             'ct_score': ct_score,
             't_score': t_score,
-            'winning_side': winning_side
+            'winning_side': winning_side,
+            'created_at': self._now_iso
         }
 
         self.storage.insert_match(match_data)
@@ -198,7 +626,7 @@ class FileStatsInserter:
         scoreboard = self._parse_scoreboard()
         rounds_df = self._parse_rounds()
         damage_df = self._parse_damage()
-        player_teams_df = self._parse_player_teams()
+        name_by_id = self._get_player_names()
 
         if scoreboard is None or len(scoreboard) == 0:
             logger.warning("No scoreboard data to insert")
@@ -212,40 +640,39 @@ class FileStatsInserter:
 
         # Calculate damage per player
         player_damage = {}
-        if damage_df is not None and len(damage_df) > 0:
-            for _, row in damage_df.iterrows():
-                steam_id = str(row.get('attacker_steamid', ''))
-                dmg = row.get('dmg_health', 0)
-                if steam_id:
-                    player_damage[steam_id] = player_damage.get(steam_id, 0) + dmg
-
-        for _, player in scoreboard.iterrows():
-            steam_id = str(player.get('steamid', ''))
-            damage = player_damage.get(steam_id, 0)
-            adr = round(damage / total_rounds, 2) if total_rounds > 0 else 0
+        if damage_df is not None and len(damage_df) > 0 and 'dmg_health' in damage_df.columns:
+            dealt = damage_df[damage_df['attacker_steamid'] != '']
+            player_damage = dealt.groupby('attacker_steamid', observed=True, sort=False)['dmg_health'].sum().to_dict()
 
-            # Get player name from player_teams if available
-            player_name = 'Unknown'
-            if player_teams_df is not None and steam_id in player_teams_df.index:
-                player_name = player_teams_df.loc[steam_id, 'user_name']
+        n_players = len(scoreboard)
 
-            player_data = {
-                'match_id': self.match_id,
-                'steam_id': steam_id,
-                'name': player_name,
-                'team': player.get('team_name', ''),
-                'kills': int(player.get('kills_total', 0)),
-                'deaths': int(player.get('deaths_total', 0)),
-                'assists': int(player.get('assists_total', 0)),
-                'headshots': int(player.get('headshot_kills_total', 0)),
-                'damage': damage,
-                'adr': adr,
-                'mvps': int(player.get('mvps', 0)),
-                'score': int(player.get('score', 0)),
-                'result': None
-            }
+        def stat(name):
+            if name in scoreboard.columns:
+                return scoreboard[name].to_numpy(np.int64)
+            return np.zeros(n_players, np.int64)
 
-            self.storage.insert_player_match(player_data)
+        steam_ids = scoreboard['steamid'] if 'steamid' in scoreboard.columns else pd.Series('', index=scoreboard.index)
+        damage = steam_ids.map(player_damage).fillna(0).to_numpy(np.int64)
+
+        # Build the records column-wise; to_dict boxes values to Python types
+        player_records = pd.DataFrame({
+            'match_id': self.match_id,
+            'steam_id': steam_ids.to_numpy(object),
+            # Get player name from player_teams if available
+            'name': steam_ids.map(name_by_id).fillna('Unknown').to_numpy(object),
+            'team': scoreboard['team_name'].to_numpy(object) if 'team_name' in scoreboard.columns else '',
+            'kills': stat('kills_total'),
+            'deaths': stat('deaths_total'),
+            'assists': stat('assists_total'),
+            'headshots': stat('headshot_kills_total'),
+            'damage': damage,
+            'adr': [round(player_total / total_rounds, 2) for player_total in damage.tolist()],
+            'mvps': stat('mvps'),
+            'score': stat('score'),
+            'result': None
+        }).to_dict('records')
+
+        self.storage.insert_player_matches(player_records)
 
         logger.info(f"Inserted {len(scoreboard)} players for match {self.match_id}")
 
@@ -257,159 +684,175 @@ class FileStatsInserter:
             logger.warning("No round data to insert")
             return
 
-        ct_score = 0
-        t_score = 0
+        n_rounds = len(rounds_df)
 
-        for idx, row in rounds_df.iterrows():
-            winner = row.get('winner')
-            reason = row.get('reason')
-            # Round number is the index + 1 (rounds start at 1, not 0)
-            round_num = idx + 1 if isinstance(idx, int) else int(idx) + 1
-
-            if winner is None:
-                continue
-
-            # Winner values: 2 = T (Terrorists), 3 = CT (Counter-Terrorists)
-            if winner == 3 or winner == 'CT':
-                ct_score += 1
-                winner_side = 'CT'
-            elif winner == 2 or winner == 'T':
-                t_score += 1
-                winner_side = 'T'
-            else:
-                winner_side = None
+        def column(name):
+            if name in rounds_df.columns:
+                return rounds_df[name].to_numpy(object)
+            return np.full(n_rounds, None, dtype=object)
 
-            round_data = {
-                'match_id': self.match_id,
-                'round_number': round_num,
-                'winner_side': winner_side,
-                'end_reason': reason,
-                'ct_score': ct_score,
-                't_score': t_score,
-                'bomb_planted': reason in ['bomb_exploded', 'bomb_defused'],
-                'bomb_defused': reason == 'bomb_defused'
-            }
+        winners = column('winner')
+        reasons = column('reason')
 
-            self.storage.insert_round(round_data)
+        # Winner values: 2 = T (Terrorists), 3 = CT (Counter-Terrorists)
+        is_ct = (winners == 3) | (winners == 'CT')
+        is_t = ~is_ct & ((winners == 2) | (winners == 'T'))
+
+        # Round number is the position + 1 (rounds start at 1, not 0); rounds
+        # without a winner are skipped but keep their number
+        round_records = pd.DataFrame({
+            'match_id': self.match_id,
+            'round_number': np.arange(1, n_rounds + 1),
+            'winner_side': np.where(is_ct, 'CT', np.where(is_t, 'T', None)),
+            'end_reason': reasons,
+            'ct_score': np.cumsum(is_ct),
+            't_score': np.cumsum(is_t),
+            'bomb_planted': (reasons == 'bomb_exploded') | (reasons == 'bomb_defused'),
+            'bomb_defused': reasons == 'bomb_defused'
+        })[np.not_equal(winners, None)].to_dict('records')
+
+        self.storage.insert_rounds(round_records)
 
         logger.info(f"Inserted {len(rounds_df)} rounds for match {self.match_id}")
 
     def insert_kills(self):
         """Insert kill events."""
         kills_df = self._parse_kills()
-        rounds_df = self._parse_rounds()
 
         if kills_df is None or len(kills_df) == 0:
             logger.warning("No kill data to insert")
             return
 
-        # Create tick-to-round mapping
-        round_ticks = []
-        for _, row in rounds_df.iterrows():
-            round_ticks.append((int(row.get('round', 0)), int(row.get('tick', 0))))
-        round_ticks.sort(key=lambda x: x[1])
-
-        def get_round_for_tick(tick):
-            current_round = 1
-            for round_num, round_tick in round_ticks:
-                if tick < round_tick:
-                    return current_round
-                current_round = round_num
-            return current_round
-
-        for _, kill in kills_df.iterrows():
-            tick = int(kill.get('tick', 0))
-
-            kill_data = {
-                'match_id': self.match_id,
-                'round_number': get_round_for_tick(tick),
-                'tick': tick,
-                'attacker_steam_id': str(kill.get('attacker_steamid', '')),
-                'attacker_name': kill.get('attacker_name'),
-                'attacker_team': None,
-                'victim_steam_id': str(kill.get('user_steamid', '')),
-                'victim_name': kill.get('user_name'),
-                'victim_team': None,
-                'weapon': kill.get('weapon'),
-                'headshot': bool(kill.get('headshot', False)),
-                'wallbang': bool(kill.get('penetrated', False)),
-                'through_smoke': bool(kill.get('thrusmoke', False)),
-                'no_scope': bool(kill.get('noscope', False)),
-                'attacker_blind': bool(kill.get('attackerblind', False)),
-                'assister_steam_id': str(kill.get('assister_steamid', '')) if kill.get('assister_steamid') else None,
-                'assister_name': kill.get('assister_name'),
-                'flash_assist': bool(kill.get('assistedflash', False))
-            }
-
-            self.storage.insert_kill(kill_data)
+        n_kills = len(kills_df)
+
+        def column(name, default=None):
+            if name in kills_df.columns:
+                return kills_df[name].to_numpy(object)
+            return np.full(n_kills, default, dtype=object)
+
+        def flag(name):
+            if name in kills_df.columns:
+                return kills_df[name].to_numpy(np.bool_)
+            return np.zeros(n_kills, dtype=np.bool_)
+
+        ticks = kills_df['tick'].to_numpy(np.int64) if 'tick' in kills_df.columns else np.zeros(n_kills, np.int64)
+
+        # Tick-to-round mapping: a kill takes the round number of the last
+        # round_end at or before its tick, or round 1 before the first one
+        round_end_ticks, round_nums = self._get_round_tick_arrays()
+        kill_rounds = round_nums[np.searchsorted(round_end_ticks, ticks, 'right')]
+
+        attacker_ids = column('attacker_steamid', '')
+        attacker_names = column('attacker_name')
+        victim_ids = column('user_steamid', '')
+        victim_names = column('user_name')
+        weapons = column('weapon')
+        assister_ids = column('assister_steamid')
+        assister_names = column('assister_name')
+        headshots = flag('headshot')
+        wallbangs = flag('penetrated')
+        through_smokes = flag('thrusmoke')
+        no_scopes = flag('noscope')
+        attacker_blinds = flag('attackerblind')
+        flash_assists = flag('assistedflash')
+
+        # Kills without an assister store None rather than ''
+        assister_ids[assister_ids == ''] = None
+
+        # Attacker/victim teams via one hash join per side; world kills and
+        # players without a team event get None
+        attacker_teams = victim_teams = np.full(n_kills, None, dtype=object)
+        team_df = self._parse_player_teams()
+        has_steamids = 'attacker_steamid' in kills_df.columns and 'user_steamid' in kills_df.columns
+        if team_df is not None and len(team_df) > 0 and has_steamids:
+            teams = team_df.assign(team=team_df['team'].astype(object))
+            with_teams = self._join_team_info(kills_df[['attacker_steamid', 'user_steamid']], teams)
+            attacker_teams = with_teams['attacker_team'].to_numpy(object)
+            attacker_teams = np.where(pd.isna(attacker_teams), None, attacker_teams)
+            victim_teams = with_teams['victim_team'].to_numpy(object)
+            victim_teams = np.where(pd.isna(victim_teams), None, victim_teams)
+
+        # Build the records column-wise; to_dict boxes values to Python types
+        kill_records = pd.DataFrame({
+            'match_id': self.match_id,
+            'round_number': kill_rounds,
+            'tick': ticks,
+            'attacker_steam_id': attacker_ids,
+            'attacker_name': attacker_names,
+            'attacker_team': pd.Series(attacker_teams, dtype=object),
+            'victim_steam_id': victim_ids,
+            'victim_name': victim_names,
+            'victim_team': pd.Series(victim_teams, dtype=object),
+            'weapon': weapons,
+            'headshot': headshots,
+            'wallbang': wallbangs,
+            'through_smoke': through_smokes,
+            'no_scope': no_scopes,
+            'attacker_blind': attacker_blinds,
+            'assister_steam_id': pd.Series(assister_ids, dtype=object),
+            'assister_name': assister_names,
+            'flash_assist': flash_assists
+        }).to_dict('records')
+
+        self.storage.insert_kills(kill_records)
 
         logger.info(f"Inserted {len(kills_df)} kills for match {self.match_id}")
 
     def insert_weapon_stats(self):
         """Insert aggregated weapon statistics."""
-        kills_df = self._parse_kills()
+        kills_df = self._parse_attacker_kills()
         damage_df = self._parse_damage()
         shots_df = self._parse_weapon_fire()
 
-        weapon_stats = {}
+        def per_weapon(df, steamid_col, **values):
+            """Group an event frame by (player, weapon) with the given aggregations."""
+            events = pd.DataFrame({
+                'steam_id': _column(df, steamid_col, ''),
+                'weapon': _column(df, 'weapon', 'unknown'),
+                **values
+            })
+            return events.groupby(['steam_id', 'weapon'], sort=False, dropna=False)
+
+        stat_frames = []
 
         # Count kills and headshots
         if kills_df is not None:
-            for _, kill in kills_df.iterrows():
-                steam_id = str(kill.get('attacker_steamid', ''))
-                weapon = kill.get('weapon', 'unknown')
-                key = (steam_id, weapon)
-
-                if key not in weapon_stats:
-                    weapon_stats[key] = {'kills': 0, 'headshots': 0, 'damage': 0, 'shots': 0, 'hits': 0}
-
-                weapon_stats[key]['kills'] += 1
-                if kill.get('headshot', False):
-                    weapon_stats[key]['headshots'] += 1
+            stat_frames.append(per_weapon(
+                kills_df, 'attacker_steamid',
+                headshot=_column(kills_df, 'headshot', False).astype(bool)
+            ).agg(kills=('headshot', 'size'), headshots=('headshot', 'sum')))
 
         # Count damage
         if damage_df is not None:
-            for _, dmg in damage_df.iterrows():
-                steam_id = str(dmg.get('attacker_steamid', ''))
-                weapon = dmg.get('weapon', 'unknown')
-                key = (steam_id, weapon)
-
-                if key not in weapon_stats:
-                    weapon_stats[key] = {'kills': 0, 'headshots': 0, 'damage': 0, 'shots': 0, 'hits': 0}
-
-                weapon_stats[key]['damage'] += int(dmg.get('dmg_health', 0))
-                weapon_stats[key]['hits'] += 1
+            stat_frames.append(per_weapon(
+                damage_df, 'attacker_steamid',
+                dmg_health=_column(damage_df, 'dmg_health', 0, np.int64)
+            ).agg(damage=('dmg_health', 'sum'), hits=('dmg_health', 'size')))
 
         # Count shots
         if shots_df is not None:
-            for _, shot in shots_df.iterrows():
-                steam_id = str(shot.get('user_steamid', ''))
-                weapon = shot.get('weapon', 'unknown')
-                key = (steam_id, weapon)
-
-                if key not in weapon_stats:
-                    weapon_stats[key] = {'kills': 0, 'headshots': 0, 'damage': 0, 'shots': 0, 'hits': 0}
-
-                weapon_stats[key]['shots'] += 1
-
-        for (steam_id, weapon), stats in weapon_stats.items():
-            if not steam_id:
-                continue
+            stat_frames.append(per_weapon(shots_df, 'user_steamid').size().to_frame('shots'))
+
+        # Outer-join on (player, weapon), keeping keys in first-seen order
+        if stat_frames:
+            keys = stat_frames[0].index
+            for frame in stat_frames[1:]:
+                keys = keys.append(frame.index)
+            weapon_stats = pd.DataFrame(index=keys.unique())
+            for frame in stat_frames:
+                weapon_stats = weapon_stats.join(frame)
+        else:
+            weapon_stats = pd.DataFrame(index=pd.MultiIndex.from_arrays([[], []], names=['steam_id', 'weapon']))
+        weapon_stats = weapon_stats.reindex(columns=['kills', 'headshots', 'damage', 'shots', 'hits'])
+        weapon_stats = weapon_stats.fillna(0).astype(np.int64).reset_index()
 
-            weapon_data = {
-                'match_id': self.match_id,
-                'steam_id': steam_id,
-                'weapon': weapon,
-                'kills': stats['kills'],
-                'headshots': stats['headshots'],
-                'damage': stats['damage'],
-                'shots': stats['shots'],
-                'hits': stats['hits']
-            }
+        weapon_records = weapon_stats[weapon_stats['steam_id'] != ''].assign(match_id=self.match_id)[[
+            'match_id', 'steam_id', 'weapon', 'kills', 'headshots', 'damage', 'shots', 'hits'
+        ]].to_dict('records')
 
-            self.storage.insert_weapon_stat(weapon_data)
+        self.storage.insert_weapon_stats(weapon_records)
 
-        logger.info(f"Inserted {len(weapon_stats)} weapon stat records for match {self.match_id}")
+        logger.info(f"Inserted {len(weapon_records)} weapon stat records for match {self.match_id}")
 
     def insert_flash_stats(self):
         """Insert aggregated flash statistics."""
@@ -425,83 +868,67 @@ class FileStatsInserter:
             logger.warning("No team data available for flash categorization")
             return
 
-        # Join flash events with team info
-        flash_with_victim_team = flash_df.merge(
-            team_df[['team', 'user_name']],
-            left_on='user_steamid',
-            right_index=True,
-            how='left',
-            suffixes=('', '_victim')
-        ).rename(columns={'team': 'victim_team', 'user_name': 'victim_name_lookup'})
-
-        flash_with_both = flash_with_victim_team.merge(
-            team_df[['team', 'user_name']],
-            left_on='attacker_steamid',
-            right_index=True,
-            how='left'
-        ).rename(columns={'team': 'attacker_team', 'user_name': 'attacker_name_lookup'})
-
-        # Aggregate stats per player
-        player_flash_stats = {}
-
-        for _, flash in flash_with_both.iterrows():
-            attacker_id = str(flash.get('attacker_steamid', ''))
-            victim_id = str(flash.get('user_steamid', ''))
-            attacker_team = flash.get('attacker_team')
-            victim_team = flash.get('victim_team')
-            attacker_name = flash.get('attacker_name') or flash.get('attacker_name_lookup', 'Unknown')
-            duration = float(flash.get('blind_duration', 0))
-
-            if not attacker_id:
-                continue
-
-            if attacker_id not in player_flash_stats:
-                player_flash_stats[attacker_id] = {
-                    'name': attacker_name,
-                    'team': attacker_team,
-                    'enemies_flashed': 0,
-                    'enemy_blind_duration': 0.0,
-                    'teammates_flashed': 0,
-                    'team_blind_duration': 0.0,
-                    'self_flashes': 0,
-                    'self_blind_duration': 0.0,
-                    'flashes_thrown': 0
-                }
-
-            if attacker_id == victim_id:
-                player_flash_stats[attacker_id]['self_flashes'] += 1
-                player_flash_stats[attacker_id]['self_blind_duration'] += duration
-            elif attacker_team == victim_team:
-                player_flash_stats[attacker_id]['teammates_flashed'] += 1
-                player_flash_stats[attacker_id]['team_blind_duration'] += duration
-            else:
-                player_flash_stats[attacker_id]['enemies_flashed'] += 1
-                player_flash_stats[attacker_id]['enemy_blind_duration'] += duration
-
-        # Count flashes thrown
+        # Events joined with team info; cached for other flash consumers
+        flash_with_both = self._parse_flash_enriched()
+
+        # Categorize every flash by its attacker/victim relationship
+        attacker_ids = _column(flash_with_both, 'attacker_steamid', '')
+        duration = _column(flash_with_both, 'blind_duration', 0, np.float64)
+        is_self = attacker_ids == _column(flash_with_both, 'user_steamid', '')
+        is_team = ~is_self & (_column(flash_with_both, 'attacker_team') == _column(flash_with_both, 'victim_team'))
+        is_enemy = ~is_self & ~is_team
+
+        flashes = pd.DataFrame({
+            'steam_id': attacker_ids,
+            'name': _column(flash_with_both, 'attacker_name'),
+            'name_lookup': _column(flash_with_both, 'attacker_name_lookup', 'Unknown'),
+            'team': _column(flash_with_both, 'attacker_team'),
+            'enemy': is_enemy,
+            'enemy_duration': np.where(is_enemy, duration, 0.0),
+            'teammate': is_team,
+            'team_duration': np.where(is_team, duration, 0.0),
+            'self': is_self,
+            'self_duration': np.where(is_self, duration, 0.0),
+        })
+        flashes = flashes[flashes['steam_id'] != '']
+
+        # Aggregate stats per player; name/team are taken from the first event seen
+        first_events = flashes.drop_duplicates('steam_id').set_index('steam_id')
+        player_flash_stats = flashes.groupby('steam_id', sort=False).agg(
+            enemies_flashed=('enemy', 'sum'),
+            enemy_blind_duration=('enemy_duration', 'sum'),
+            teammates_flashed=('teammate', 'sum'),
+            team_blind_duration=('team_duration', 'sum'),
+            self_flashes=('self', 'sum'),
+            self_blind_duration=('self_duration', 'sum'),
+        )
+
+        # Count flashes thrown, for players who flashed someone
+        thrown_counts = {}
         if weapon_fire_df is not None and len(weapon_fire_df) > 0:
-            flashbang_fires = weapon_fire_df[weapon_fire_df['weapon'] == 'flashbang']
-            for _, fire in flashbang_fires.iterrows():
-                steam_id = str(fire.get('user_steamid', ''))
-                if steam_id and steam_id in player_flash_stats:
-                    player_flash_stats[steam_id]['flashes_thrown'] += 1
+            flashbang_fires = weapon_fire_df.loc[weapon_fire_df['weapon'] == 'flashbang', 'user_steamid']
+            thrown_counts = flashbang_fires.value_counts().to_dict()
 
-        for steam_id, stats in player_flash_stats.items():
+        flash_records = []
+        for steam_id, stats in zip(player_flash_stats.index, player_flash_stats.to_dict('records')):
+            first = first_events.loc[steam_id]
             flash_data = {
                 'match_id': self.match_id,
                 'steam_id': steam_id,
-                'name': stats['name'],
-                'team': stats['team'],
+                'name': first['name'] or first['name_lookup'],
+                'team': first['team'],
                 'enemies_flashed': stats['enemies_flashed'],
                 'enemy_blind_duration': round(stats['enemy_blind_duration'], 2),
                 'teammates_flashed': stats['teammates_flashed'],
                 'team_blind_duration': round(stats['team_blind_duration'], 2),
                 'self_flashes': stats['self_flashes'],
                 'self_blind_duration': round(stats['self_blind_duration'], 2),
-                'flashes_thrown': stats['flashes_thrown']
+                'flashes_thrown': thrown_counts.get(steam_id, 0)
             }
 
-            self.storage.insert_flash_stat(flash_data)
+            flash_records.append(flash_data)
+
+        self.storage.insert_flash_stats(flash_records)
 
         logger.info(f"Inserted flash stats for {len(player_flash_stats)} players in match {self.match_id}")
 
@@ -518,73 +945,66 @@ class FileStatsInserter:
             logger.warning("No team data available for damage categorization")
             return
 
-        # Join damage events with team info
-        damage_with_victim_team = damage_df.merge(
-            team_df[['team', 'user_name']],
-            left_on='user_steamid',
-            right_index=True,
-            how='left',
-            suffixes=('', '_victim')
-        ).rename(columns={'team': 'victim_team', 'user_name': 'victim_name_lookup'})
-
-        damage_with_both = damage_with_victim_team.merge(
-            team_df[['team', 'user_name']],
-            left_on='attacker_steamid',
-            right_index=True,
-            how='left'
-        ).rename(columns={'team': 'attacker_team', 'user_name': 'attacker_name_lookup'})
-
-        # Aggregate stats per player
-        player_damage_stats = {}
-
-        for _, dmg in damage_with_both.iterrows():
-            attacker_id = str(dmg.get('attacker_steamid', ''))
-            victim_id = str(dmg.get('user_steamid', ''))
-            attacker_team = dmg.get('attacker_team')
-            victim_team = dmg.get('victim_team')
-            attacker_name = dmg.get('attacker_name') or dmg.get('attacker_name_lookup', 'Unknown')
-            damage = int(dmg.get('dmg_health', 0))
-
-            if not attacker_id or damage <= 0:
-                continue
-
-            if attacker_id not in player_damage_stats:
-                player_damage_stats[attacker_id] = {
-                    'name': attacker_name,
-                    'team': attacker_team,
-                    'enemy_damage': 0,
-                    'team_damage': 0,
-                    'self_damage': 0,
-                    'total_damage': 0,
-                    'team_damage_incidents': 0
-                }
-
-            player_damage_stats[attacker_id]['total_damage'] += damage
+        # Events joined with team info; cached for other damage consumers
+        damage_with_both = self._parse_damage_enriched()
 
-            if attacker_id == victim_id:
-                player_damage_stats[attacker_id]['self_damage'] += damage
-            elif attacker_team == victim_team:
-                player_damage_stats[attacker_id]['team_damage'] += damage
-                player_damage_stats[attacker_id]['team_damage_incidents'] += 1
-            else:
-                player_damage_stats[attacker_id]['enemy_damage'] += damage
+        # Only damage actually dealt by a player counts
+        if 'dmg_health' in damage_with_both.columns:
+            damage = damage_with_both['dmg_health'].to_numpy(np.int64)
+        else:
+            damage = np.zeros(len(damage_with_both), np.int64)
+        counted = (damage_with_both['attacker_steamid'] != '').to_numpy() & (damage > 0)
+        events = damage_with_both[counted]
+        damage = damage[counted]
+
+        attacker_ids = events['attacker_steamid'].to_numpy(object)
+        is_self = attacker_ids == events['user_steamid'].to_numpy(object)
+        is_team = ~is_self & (events['attacker_team'] == events['victim_team']).to_numpy()
+        is_enemy = ~is_self & ~is_team
+
+        # Per-player accumulators as parallel arrays indexed by player code,
+        # with players coded in the order they are first seen
+        codes, steam_ids = pd.factorize(attacker_ids)
+        n_players = len(steam_ids)
+
+        def damage_sum(mask):
+            return np.bincount(codes[mask], weights=damage[mask], minlength=n_players).astype(np.int64)
+
+        total_damage = damage_sum(np.ones(len(codes), np.bool_))
+        self_damage = damage_sum(is_self)
+        team_damage = damage_sum(is_team)
+        enemy_damage = damage_sum(is_enemy)
+        team_damage_incidents = np.bincount(codes[is_team], minlength=n_players)
+
+        # Name/team are taken from each player's first event
+        _, first_rows = np.unique(codes, return_index=True)
+        first_events = events.iloc[first_rows]
+        if 'attacker_name' in first_events.columns:
+            names = first_events['attacker_name'].to_numpy(object)
+        else:
+            names = np.full(n_players, None, dtype=object)
+        lookup_names = first_events['attacker_name_lookup'].to_numpy(object)
+        teams = first_events['attacker_team'].to_numpy(object)
 
-        for steam_id, stats in player_damage_stats.items():
+        damage_records = []
+        for i, steam_id in enumerate(steam_ids):
             damage_data = {
                 'match_id': self.match_id,
                 'steam_id': steam_id,
-                'name': stats['name'],
-                'team': stats['team'],
-                'enemy_damage': stats['enemy_damage'],
-                'team_damage': stats['team_damage'],
-                'self_damage': stats['self_damage'],
-                'total_damage': stats['total_damage'],
-                'team_damage_incidents': stats['team_damage_incidents']
+                'name': names[i] or lookup_names[i],
+                'team': teams[i],
+                'enemy_damage': int(enemy_damage[i]),
+                'team_damage': int(team_damage[i]),
+                'self_damage': int(self_damage[i]),
+                'total_damage': int(total_damage[i]),
+                'team_damage_incidents': int(team_damage_incidents[i])
             }
 
-            self.storage.insert_damage_stat(damage_data)
+            damage_records.append(damage_data)
+
+        self.storage.insert_damage_stats(damage_records)
 
-        logger.info(f"Inserted damage stats for {len(player_damage_stats)} players in match {self.match_id}")
+        logger.info(f"Inserted damage stats for {n_players} players in match {self.match_id}")
 
     def insert_clutch_stats(self):
         """Insert clutch situation statistics (1vX scenarios)."""
@@ -599,78 +1019,65 @@ class FileStatsInserter:
         # Track clutch scenarios per round
         clutch_situations = {}  # Key: (round, steam_id), Value: {enemies_alive, won}
 
-        # For each round, track player states at different ticks
-        for round_idx, round_data in rounds_df.iterrows():
-            round_num = round_idx + 1 if isinstance(round_idx, int) else int(round_idx) + 1
-            round_tick_start = 0 if round_idx == 0 else rounds_df.iloc[round_idx - 1]['tick'] if round_idx > 0 else 0
-            round_tick_end = round_data.get('tick', float('inf'))
-            winner = round_data.get('winner')
-
-            # Get kills in this round
-            round_kills = kills_df[(kills_df['tick'] >= round_tick_start) & (kills_df['tick'] < round_tick_end)]
-
-            # Track alive players throughout the round
-            initial_players = {}  # steam_id -> team
-            if team_df is not None:
-                for steam_id, player in team_df.iterrows():
-                    initial_players[steam_id] = player['team']
-
-            alive_players = initial_players.copy()
-
-            # Process kills chronologically
-            for _, kill in round_kills.sort_values('tick').iterrows():
-                victim_id = str(kill.get('user_steamid', ''))
-                if victim_id in alive_players:
-                    del alive_players[victim_id]
-
-                # Check for clutch situations (1vX)
-                if len(alive_players) > 0:
-                    teams = {}
-                    for player_id, team in alive_players.items():
-                        if team not in teams:
-                            teams[team] = []
-                        teams[team].append(player_id)
-
-                    # Check if we have a 1vX situation
-                    if len(teams) == 2:
-                        team_counts = {team: len(players) for team, players in teams.items()}
-                        for team, players in teams.items():
-                            if len(players) == 1:  # This player is alone
-                                other_team = [t for t in teams.keys() if t != team][0]
-                                enemies_alive = len(teams[other_team])
-
-                                if enemies_alive > 0:  # 1vX clutch situation
-                                    player_id = players[0]
-                                    clutch_key = (round_num, player_id)
-                                    clutch_situations[clutch_key] = {
-                                        'enemies_alive': enemies_alive,
-                                        'round': round_num,
-                                        'won': None  # Will determine at round end
-                                    }
-
-        # Determine clutch outcomes
-        for (round_num, player_id), situation in clutch_situations.items():
-            # Check if the player's team won
-            if round_num - 1 < len(rounds_df):
-                round_data = rounds_df.iloc[round_num - 1]
-                winner = round_data.get('winner')
-                if team_df is not None and player_id in team_df.index:
-                    player_team = team_df.loc[player_id, 'team']
-                    # Winner values: 2 = T, 3 = CT
-                    won = (winner == 3 and player_team == 'CT') or (winner == 2 and player_team == 'T')
-                    situation['won'] = won
+        if team_df is not None and len(team_df) > 0:
+            # Assign each kill to the round whose end tick it precedes; kills
+            # after the final round end belong to no round
+            _, round_end_ticks = self._get_round_bounds()
+            # Kills are tick-sorted at parse time
+            ticks = kills_df['tick'].to_numpy(np.float64)
+            round_of_kill = np.searchsorted(round_end_ticks, ticks, 'right')
+            in_round = round_of_kill < len(round_end_ticks)
+
+            player_ids = team_df.index
+            victim_ids = player_ids.get_indexer(kills_df['user_steamid'].to_numpy(object))
+            team_codes, team_labels = pd.factorize(team_df['team'], use_na_sentinel=False)
+
+            round_arr, player_arr, enemies_arr = _scan_clutches(
+                victim_ids[in_round].astype(np.int64),
+                round_of_kill[in_round].astype(np.int64),
+                team_codes.astype(np.int64),
+                len(team_labels)
+            )
+
+            for round_idx, player_idx, enemies_alive in zip(round_arr.tolist(), player_arr.tolist(), enemies_arr.tolist()):
+                round_num = round_idx + 1
+                clutch_situations[(round_num, player_ids[player_idx])] = {
+                    'enemies_alive': enemies_alive,
+                    'round': round_num,
+                    'won': None  # Will determine at round end
+                }
+
+        # Determine clutch outcomes with two joins instead of per-situation lookups
+        if clutch_situations and team_df is not None:
+            clutch_df = pd.DataFrame(
+                [{'round': r, 'pid': p} for (r, p) in clutch_situations.keys()]
+            )
+            round_winners = pd.DataFrame({
+                'round': range(1, len(rounds_df) + 1),
+                'winner': rounds_df['winner'].to_numpy() if 'winner' in rounds_df.columns else None
+            })
+            clutch_df = clutch_df.merge(round_winners, on='round', how='left').merge(
+                team_df['team'].rename('player_team'),
+                left_on='pid',
+                right_index=True,
+                how='left'
+            )
+            # Winner values: 2 = T, 3 = CT
+            clutch_df['won'] = (
+                ((clutch_df['winner'] == 3) & (clutch_df['player_team'] == 'CT')) |
+                ((clutch_df['winner'] == 2) & (clutch_df['player_team'] == 'T'))
+            )
+            for round_num, player_id, won in clutch_df[['round', 'pid', 'won']].itertuples(index=False, name=None):
+                clutch_situations[(round_num, player_id)]['won'] = bool(won)
 
         # Aggregate clutch stats per player
+        name_by_id = self._get_player_names()
         player_clutch_stats = {}
 
         for (round_num, player_id), situation in clutch_situations.items():
             if player_id not in player_clutch_stats:
-                player_name = 'Unknown'
-                if team_df is not None and player_id in team_df.index:
-                    player_name = team_df.loc[player_id, 'user_name']
-
                 player_clutch_stats[player_id] = {
-                    'name': player_name,
+                    'name': name_by_id.get(player_id, 'Unknown'),
                     '1v1_attempts': 0, '1v1_won': 0,
                     '1v2_attempts': 0, '1v2_won': 0,
                     '1v3_attempts': 0, '1v3_won': 0,
@@ -692,6 +1099,7 @@ class FileStatsInserter:
             if won:
                 player_clutch_stats[player_id]['total_won'] += 1
 
+        clutch_records = []
         # Insert to storage
         for steam_id, stats in player_clutch_stats.items():
             clutch_data = {
@@ -712,72 +1120,47 @@ class FileStatsInserter:
                 'total_clutches_won': stats['total_won']
             }
 
-            self.storage.insert_clutch_stat(clutch_data)
+            clutch_records.append(clutch_data)
+
+        self.storage.insert_clutch_stats(clutch_records)
 
         logger.info(f"Inserted clutch stats for {len(player_clutch_stats)} players in match {self.match_id}")
 
     def insert_multikill_stats(self):
         """Insert multikill statistics (2K, 3K, 4K, 5K sprees)."""
         kills_df = self._parse_kills()
-        rounds_df = self._parse_rounds()
-        team_df = self._parse_player_teams()
 
         if kills_df is None or len(kills_df) == 0:
             logger.warning("No kill data available for multikill analysis")
             return
 
-        player_multikill_stats = {}
+        kill_counts, _ = self._compute_round_stats()
+
+        # Bucket per player in order of their first kill:
+        # 2 = double, 3 = triple, 4 = quad, 5+ = ace
+        player_codes, player_ids = pd.factorize(kill_counts['attacker_steamid'].to_numpy())
+        doubles, triples, quads, aces = _bucket_multikills(
+            kill_counts['kills'].to_numpy().astype(np.int64),
+            player_codes.astype(np.int64),
+            len(player_ids)
+        )
 
-        # Process each round separately
-        for round_idx, round_data in rounds_df.iterrows():
-            round_num = round_idx + 1 if isinstance(round_idx, int) else int(round_idx) + 1
-            round_tick_start = 0 if round_idx == 0 else rounds_df.iloc[round_idx - 1]['tick'] if round_idx > 0 else 0
-            round_tick_end = round_data.get('tick', float('inf'))
-
-            # Get kills in this round
-            round_kills = kills_df[(kills_df['tick'] >= round_tick_start) & (kills_df['tick'] < round_tick_end)]
-
-            # Track consecutive kills per player
-            player_kills_in_round = {}
-            for _, kill in round_kills.iterrows():
-                attacker_id = str(kill.get('attacker_steamid', ''))
-                if not attacker_id:
-                    continue
-
-                if attacker_id not in player_kills_in_round:
-                    player_kills_in_round[attacker_id] = 0
-                player_kills_in_round[attacker_id] += 1
-
-            # Record multikills
-            for attacker_id, kill_count in player_kills_in_round.items():
-                if attacker_id not in player_multikill_stats:
-                    player_name = 'Unknown'
-                    if team_df is not None and attacker_id in team_df.index:
-                        player_name = team_df.loc[attacker_id, 'user_name']
-
-                    player_multikill_stats[attacker_id] = {
-                        'name': player_name,
-                        'double_kills': 0,
-                        'triple_kills': 0,
-                        'quad_kills': 0,
-                        'aces': 0,
-                        'total_multikills': 0
-                    }
-
-                # Count multikills (2+ kills in a round)
-                if kill_count == 2:
-                    player_multikill_stats[attacker_id]['double_kills'] += 1
-                    player_multikill_stats[attacker_id]['total_multikills'] += 1
-                elif kill_count == 3:
-                    player_multikill_stats[attacker_id]['triple_kills'] += 1
-                    player_multikill_stats[attacker_id]['total_multikills'] += 1
-                elif kill_count == 4:
-                    player_multikill_stats[attacker_id]['quad_kills'] += 1
-                    player_multikill_stats[attacker_id]['total_multikills'] += 1
-                elif kill_count >= 5:
-                    player_multikill_stats[attacker_id]['aces'] += 1
-                    player_multikill_stats[attacker_id]['total_multikills'] += 1
+        name_by_id = self._get_player_names()
 
+        player_multikill_stats = {}
+        for steam_id, double_kills, triple_kills, quad_kills, ace_count in zip(
+            player_ids, doubles.tolist(), triples.tolist(), quads.tolist(), aces.tolist()
+        ):
+            player_multikill_stats[steam_id] = {
+                'name': name_by_id.get(steam_id, 'Unknown'),
+                'double_kills': double_kills,
+                'triple_kills': triple_kills,
+                'quad_kills': quad_kills,
+                'aces': ace_count,
+                'total_multikills': double_kills + triple_kills + quad_kills + ace_count
+            }
+
+        multikill_records = []
         # Insert to storage
         for steam_id, stats in player_multikill_stats.items():
             multikill_data = {
@@ -791,7 +1174,9 @@ class FileStatsInserter:
                 'total_multikills': stats['total_multikills']
             }
 
-            self.storage.insert_multikill_stat(multikill_data)
+            multikill_records.append(multikill_data)
+
+        self.storage.insert_multikill_stats(multikill_records)
 
         logger.info(f"Inserted multikill stats for {len(player_multikill_stats)} players in match {self.match_id}")
 
@@ -799,100 +1184,65 @@ class FileStatsInserter:
         """Insert first blood statistics (opening kills per round)."""
         kills_df = self._parse_kills()
         rounds_df = self._parse_rounds()
-        team_df = self._parse_player_teams()
 
         if kills_df is None or len(kills_df) == 0 or rounds_df is None or len(rounds_df) == 0:
             logger.warning("No kill or round data available for first blood analysis")
             return
 
-        player_first_blood_stats = {}
-
-        # Process each round
-        for round_idx, round_data in rounds_df.iterrows():
-            round_num = round_idx + 1 if isinstance(round_idx, int) else int(round_idx) + 1
-            round_tick_start = 0 if round_idx == 0 else rounds_df.iloc[round_idx - 1]['tick'] if round_idx > 0 else 0
-            round_tick_end = round_data.get('tick', float('inf'))
-
-            # Get kills in this round
-            round_kills = kills_df[(kills_df['tick'] >= round_tick_start) & (kills_df['tick'] < round_tick_end)]
+        _, firsts = self._compute_round_stats()
+        attackers = firsts['attacker_steamid'].to_list()
+        victims = firsts['user_steamid'].to_list()
 
-            if len(round_kills) == 0:
-                continue
-
-            # Get first kill of the round
-            first_kill = round_kills.sort_values('tick').iloc[0]
-            attacker_id = str(first_kill.get('attacker_steamid', ''))
-            victim_id = str(first_kill.get('user_steamid', ''))
-
-            if not attacker_id:
-                continue
-
-            # Initialize stats for attacker
-            if attacker_id not in player_first_blood_stats:
-                player_name = 'Unknown'
-                if team_df is not None and attacker_id in team_df.index:
-                    player_name = team_df.loc[attacker_id, 'user_name']
-
-                player_first_blood_stats[attacker_id] = {
-                    'name': player_name,
-                    'first_bloods': 0,
-                    'first_deaths': 0
-                }
-
-            # Initialize stats for victim
-            if victim_id not in player_first_blood_stats:
-                victim_name = 'Unknown'
-                if team_df is not None and victim_id in team_df.index:
-                    victim_name = team_df.loc[victim_id, 'user_name']
-
-                player_first_blood_stats[victim_id] = {
-                    'name': victim_name,
-                    'first_bloods': 0,
-                    'first_deaths': 0
-                }
-
-            player_first_blood_stats[attacker_id]['first_bloods'] += 1
-            player_first_blood_stats[victim_id]['first_deaths'] += 1
+        # Players in order of appearance (attacker before victim, round by round)
+        player_ids = list(dict.fromkeys(steam_id for pair in zip(attackers, victims) for steam_id in pair))
+        first_bloods = Counter(attackers)
+        first_deaths = Counter(victims)
+        name_by_id = self._get_player_names()
 
+        first_blood_records = []
         # Insert to storage
-        for steam_id, stats in player_first_blood_stats.items():
+        for steam_id in player_ids:
             first_blood_data = {
                 'match_id': self.match_id,
                 'steam_id': steam_id,
-                'name': stats['name'],
-                'first_bloods': stats['first_bloods'],
-                'first_deaths': stats['first_deaths']
+                'name': name_by_id.get(steam_id, 'Unknown'),
+                'first_bloods': first_bloods[steam_id],
+                'first_deaths': first_deaths[steam_id]
             }
 
-            self.storage.insert_first_blood_stat(first_blood_data)
+            first_blood_records.append(first_blood_data)
+
+        self.storage.insert_first_blood_stats(first_blood_records)
 
-        logger.info(f"Inserted first blood stats for {len(player_first_blood_stats)} players in match {self.match_id}")
+        logger.info(f"Inserted first blood stats for {len(player_ids)} players in match {self.match_id}")
+
+    def insert_round_derived_stats(self):
+        """Insert multikill and first blood stats from one shared pass over the kills."""
+        self.insert_multikill_stats()
+        self.insert_first_blood_stats()
 
     def insert_chat_messages(self):
         """Insert chat messages for sentiment analysis."""
-        try:
-            chat_df = self.parser.parse_event("chat_message")
-        except Exception as e:
-            logger.warning(f"Could not parse chat messages: {e}")
-            return
-
+        chat_df = self._parse_chat_messages()
         if chat_df is None or len(chat_df) == 0:
             logger.info("No chat messages in this demo")
             return
 
-        count = 0
-        for _, msg in chat_df.iterrows():
-            chat_data = {
-                'match_id': self.match_id,
-                'tick': int(msg.get('tick', 0)),
-                'steam_id': str(msg.get('user_steamid', '')),
-                'player_name': msg.get('user_name', 'Unknown'),
-                'message': msg.get('chat_message', ''),
-            }
-            self.storage.insert_chat_message(chat_data)
-            count += 1
+        # Fill any missing columns with their defaults and drop empty messages
+        defaults = {'tick': 0, 'user_steamid': '', 'user_name': 'Unknown', 'chat_message': ''}
+        chat_df = chat_df.assign(**{col: value for col, value in defaults.items() if col not in chat_df.columns})
+        chat_df = chat_df[chat_df['chat_message'].fillna('').astype(str).ne('')]
+
+        # Rename into the chat_messages schema in one shot
+        chat_records = chat_df[list(defaults)].rename(columns={
+            'user_steamid': 'steam_id',
+            'user_name': 'player_name',
+            'chat_message': 'message'
+        }).assign(match_id=self.match_id)[['match_id', 'tick', 'steam_id', 'player_name', 'message']].to_dict('records')
+
+        self.storage.insert_chat_messages(chat_records)
 
-        logger.info(f"Inserted {count} chat messages for match {self.match_id}")
+        logger.info(f"Inserted {len(chat_records)} chat messages for match {self.match_id}")
 
     def extract_voice(self) -> Optional[VoiceExtractionResult]:
         """
@@ -939,26 +1289,66 @@ class FileStatsInserter:
 
         return result
 
+    def prefetch(self):
+        """
+        Run every demo parse up front, concurrently. demoparser2 is a Rust
+        extension that releases the GIL while parsing, so the event parses
+        overlap; each result lands in its cache for the insert_* methods.
+        """
+        parses = [
+            self._parse_header,
+            self._parse_rounds,
+            self._parse_kills,
+            self._parse_scoreboard,
+            self._parse_damage,
+            self._parse_flash_events,
+            self._parse_player_teams,
+            self._parse_weapon_fire,
+            self._parse_chat_messages,
+        ]
+        with ThreadPoolExecutor(max_workers=PARSE_WORKERS) as executor:
+            futures = [executor.submit(parse) for parse in parses]
+        for future in futures:
+            future.result()
+
     def insert_all(self, extract_voice: bool = True):
         """Insert all data for this demo."""
         logger.info(f"Starting full insert for match {self.match_id}")
 
-        self.insert_match()
-        self.insert_player_matches()
-        self.insert_rounds()
-        self.insert_kills()
-        self.insert_weapon_stats()
-        self.insert_flash_stats()
-        self.insert_damage_stats()
-        self.insert_clutch_stats()
-        self.insert_multikill_stats()
-        self.insert_first_blood_stats()
-        self.insert_chat_messages()
+        # Voice extraction (optional, requires csgo-voice-extractor) runs an
+        # external process, so start it first and let it overlap the inserts
+        voice_executor = ThreadPoolExecutor(max_workers=1) if extract_voice else None
+        voice_future = voice_executor.submit(self.extract_voice) if voice_executor else None
 
-        # Voice extraction (optional, requires csgo-voice-extractor)
-        voice_result = None
-        if extract_voice:
-            voice_result = self.extract_voice()
+        try:
+            self.prefetch()
+
+            # Buffer all table writes and flush each table once at the end
+            with self.storage.transaction():
+                self.insert_match()
+                self.insert_player_matches()
+
+                # The remaining inserters only share the cached parse results and
+                # each writes its own table, so run them concurrently
+                independent_inserts = [
+                    self.insert_rounds,
+                    self.insert_kills,
+                    self.insert_weapon_stats,
+                    self.insert_flash_stats,
+                    self.insert_damage_stats,
+                    self.insert_clutch_stats,
+                    self.insert_round_derived_stats,
+                    self.insert_chat_messages,
+                ]
+                with ThreadPoolExecutor(max_workers=INSERT_WORKERS) as executor:
+                    futures = [executor.submit(insert) for insert in independent_inserts]
+                for future in futures:
+                    future.result()
+
+            voice_result = voice_future.result() if voice_future else None
+        finally:
+            if voice_executor:
+                voice_executor.shutdown(wait=True)
 
         logger.info(f"Completed full insert for match {self.match_id}")
         return self.match_id, voice_result
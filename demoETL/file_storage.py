@@ -13,17 +13,54 @@ Usage:
     storage.insert_match(match_data)
     storage.insert_player_matches(players_data)
     # etc.
+
+Per-match tables can optionally be sharded into one file per match
+(tables/<table>/<match_id>.json), so each match is written and queried
+without touching the other matches' records:
+    storage = FileStorage(sharded_tables=['kills', 'chat_messages'])
 """
 
 import os
 import json
 import logging as logger
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.info("orjson not installed. Tables will be encoded with the stdlib json module.")
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+    logger.info("ijson not installed. Queries will load whole tables before filtering.")
+
+# Parse errors that make a streamed query fall back to a full table load
+STREAM_ERRORS = (ijson.JSONError,) if IJSON_AVAILABLE else ()
 
 # Path to tables directory (relative to project root)
 TABLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'tables')
 
+# Small tables that are still written indented for easy inspection; the
+# event-level tables are written compact
+PRETTY_TABLES = {'matches'}
+
+# Tables keyed by match_id that can be sharded into one file per match.
+# The stattrak server reads the flat tables/<table>.json files, so sharding
+# is opt-in and meant for ETL-only table directories.
+SHARDABLE_TABLES = {
+    'player_matches', 'rounds', 'kills', 'weapon_stats', 'flash_stats',
+    'damage_stats', 'clutch_stats', 'multikill_stats', 'first_blood_stats',
+    'chat_messages',
+}
+
 
 class FileStorage:
     """
@@ -31,52 +68,336 @@ class FileStorage:
     Each table is stored as a separate JSON file containing an array of records.
     """
 
-    def __init__(self, tables_dir: str = TABLES_DIR):
+    def __init__(self, tables_dir: str = TABLES_DIR, sharded_tables: Iterable[str] = ()):
         self.tables_dir = os.path.abspath(tables_dir)
         os.makedirs(self.tables_dir, exist_ok=True)
+        # Tables stored as one file per match under tables/<table>/
+        self.sharded_tables = set()
+        for table_name in sharded_tables:
+            if table_name not in SHARDABLE_TABLES:
+                logger.warning(f"Table {table_name} is not keyed by match_id, keeping it unsharded")
+                continue
+            if os.path.exists(self._get_table_path(table_name)):
+                logger.warning(f"Sharding {table_name}: records in {table_name}.json will no longer be read")
+            self.sharded_tables.add(table_name)
+        # Per-table locks so concurrent writers don't interleave read-modify-write
+        self._table_locks = {}
+        self._table_locks_guard = threading.Lock()
+        # Open transaction state: tables loaded or written inside transaction()
+        # are kept in memory and flushed to disk once when it commits
+        self._transaction_depth = 0
+        self._transaction_tables = {}
+        self._transaction_dirty = set()
+        # Key indexes of buffered tables, keyed by (table_name, key_fields)
+        self._transaction_indices = {}
+        # Appends to tables that were never loaded in the transaction
+        self._transaction_appends = {}
+        self._transaction_guard = threading.RLock()
+        # Tables parsed by _cached_read_table, keyed by table name and
+        # stored with the (inode, mtime, size) stamp of the file they came from
+        self._read_cache = {}
         logger.info(f"FileStorage initialized at {self.tables_dir}")
 
     def _get_table_path(self, table_name: str) -> str:
-        """Get the file path for a table."""
-        return os.path.join(self.tables_dir, f"{table_name}.json")
-
-    def _read_table(self, table_name: str) -> List[Dict[str, Any]]:
-        """Read all records from a table file."""
+        """Get the file path for a table (or a '<table>/<match_id>' shard)."""
+        return os.path.join(self.tables_dir, *f"{table_name}.json".split('/'))
+
+    def _shard_name(self, table_name: str, match_id: Any) -> str:
+        """Name of the shard holding one match's records of a sharded table."""
+        return f"{table_name}/{match_id}"
+
+    def _partition_names(self, table_name: str, match_id: Any = None) -> List[str]:
+        """
+        Names of the files holding a table's records: the table itself, or for
+        a sharded table its shards (only the match's own shard when match_id
+        is given), including shards so far only buffered in a transaction.
+        """
+        if table_name not in self.sharded_tables:
+            return [table_name]
+        if match_id:
+            return [self._shard_name(table_name, match_id)]
+
+        names = set()
+        shard_dir = os.path.join(self.tables_dir, table_name)
+        if os.path.isdir(shard_dir):
+            names.update(self._shard_name(table_name, f[:-len('.json')])
+                         for f in os.listdir(shard_dir) if f.endswith('.json'))
+        with self._transaction_guard:
+            prefix = f"{table_name}/"
+            names.update(n for n in self._transaction_tables if n.startswith(prefix))
+            names.update(n for n in self._transaction_appends if n.startswith(prefix))
+        return sorted(names)
+
+    def _table_lock(self, table_name: str) -> threading.RLock:
+        """Get the lock guarding writes to a table."""
+        with self._table_locks_guard:
+            if table_name not in self._table_locks:
+                self._table_locks[table_name] = threading.RLock()
+            return self._table_locks[table_name]
+
+    def _load_table(self, table_name: str) -> List[Dict[str, Any]]:
+        """Load all records from a table file on disk."""
         path = self._get_table_path(table_name)
         if os.path.exists(path):
+            if ORJSON_AVAILABLE:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                try:
+                    return orjson.loads(data)
+                except orjson.JSONDecodeError:
+                    # Tables written by the stdlib encoder may hold bare NaN tokens
+                    return json.loads(data)
             with open(path, 'r') as f:
                 return json.load(f)
         return []
 
-    def _write_table(self, table_name: str, records: List[Dict[str, Any]]):
-        """Write all records to a table file."""
+    def _encode_table(self, table_name: str, records: List[Dict[str, Any]]) -> bytes:
+        """Encode records as a JSON array, indented only for PRETTY_TABLES."""
+        pretty = table_name in PRETTY_TABLES
+        if ORJSON_AVAILABLE:
+            option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if pretty else 0)
+            return orjson.dumps(records, default=str, option=option)
+        return json.dumps(records, indent=2 if pretty else None, default=str).encode()
+
+    def _dump_table(self, table_name: str, records: List[Dict[str, Any]]):
+        """
+        Write all records to a table file. The data goes to a temp file that
+        is renamed over the table, so readers never see a half-written file.
+        """
         path = self._get_table_path(table_name)
-        with open(path, 'w') as f:
-            json.dump(records, f, indent=2, default=str)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self._encode_table(table_name, records))
+        os.replace(tmp_path, path)
+
+    def _append_table(self, table_name: str, records: List[Dict[str, Any]]):
+        """
+        Append records to a table file in place. The new records are written
+        over the array's closing bracket, so the cost depends only on the
+        records appended, not on the size of the table. Falls back to a full
+        rewrite if the file doesn't end in a JSON array.
+
+        Unlike _dump_table this is not atomic: until the write is synced, a
+        reader (or a crash) can see the file without its closing bracket. It
+        is only used for transaction flushes, which batch a whole demo's
+        appends into one write per table.
+        """
+        if not records:
+            return
+        path = self._get_table_path(table_name)
+        if os.path.exists(path):
+            with open(path, 'rb+') as f:
+                f.seek(0, os.SEEK_END)
+                tail_start = max(0, f.tell() - 4096)
+                f.seek(tail_start)
+                tail = f.read().rstrip()
+                head = tail[:-1].rstrip()
+                if tail.endswith(b']') and head:
+                    separator = b'' if head.endswith(b'[') else b','
+                    f.seek(tail_start + len(tail) - 1)
+                    f.write(separator + self._encode_table(table_name, records)[1:-1].strip() + b']')
+                    f.truncate()
+                    f.flush()
+                    os.fsync(f.fileno())
+                    return
+        self._dump_table(table_name, self._load_table(table_name) + records)
+
+    def _pending_appends(self, table_name: str) -> List[Dict[str, Any]]:
+        """Take the appends buffered for a table that hasn't been loaded yet."""
+        return self._transaction_appends.pop(table_name, [])
 
-    def _upsert_record(self, table_name: str, record: Dict[str, Any], key_fields: List[str]):
-        """Insert or update a record based on key fields."""
-        records = self._read_table(table_name)
+    def _read_table(self, table_name: str) -> List[Dict[str, Any]]:
+        """Read all records from a table (buffered copy inside a transaction)."""
+        if table_name in self.sharded_tables:
+            return [r for name in self._partition_names(table_name) for r in self._read_table(name)]
+        with self._transaction_guard:
+            if self._transaction_depth == 0:
+                return self._load_table(table_name)
+            if table_name not in self._transaction_tables:
+                appended = self._pending_appends(table_name)
+                self._transaction_tables[table_name] = self._load_table(table_name) + appended
+                if appended:
+                    self._transaction_dirty.add(table_name)
+            return self._transaction_tables[table_name]
+
+    def _cached_read_table(self, table_name: str) -> List[Dict[str, Any]]:
+        """
+        Read all records from a table, reusing the last parse while the file
+        on disk is unchanged. Returns a new list, but the records themselves
+        are shared with the cache and must not be modified.
+        """
+        with self._transaction_guard:
+            if self._transaction_depth > 0 or table_name in self.sharded_tables:
+                # Copy so callers can't reorder a buffered table's pending write
+                return list(self._read_table(table_name))
+        try:
+            stat = os.stat(self._get_table_path(table_name))
+        except FileNotFoundError:
+            return []
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached = self._read_cache.get(table_name)
+        if cached is None or cached[0] != stamp:
+            cached = self._read_cache[table_name] = (stamp, self._load_table(table_name))
+        return list(cached[1])
 
-        # Find existing record by key
-        existing_idx = None
+    def _write_table(self, table_name: str, records: List[Dict[str, Any]]):
+        """Write all records to a table (deferred until commit inside a transaction)."""
+        with self._transaction_guard:
+            if self._transaction_depth == 0:
+                self._dump_table(table_name, records)
+                return
+            if self._transaction_tables.get(table_name) is not records:
+                self._drop_key_indices(table_name)
+            self._transaction_tables[table_name] = records
+            self._transaction_dirty.add(table_name)
+
+    def _drop_key_indices(self, table_name: str, keep: Optional[tuple] = None):
+        """Forget cached key indexes of a table, except the one keyed by keep."""
+        with self._transaction_guard:
+            for cache_key in [k for k in self._transaction_indices if k[0] == table_name and k != keep]:
+                del self._transaction_indices[cache_key]
+
+    def _key_index(self, table_name: str, records: List[Dict[str, Any]], key_fields: List[str]) -> Dict[tuple, int]:
+        """
+        Map each key tuple to the position of its first row in records. Inside
+        a transaction the index is cached with the buffered table, so repeated
+        upserts into the same table don't rebuild it.
+        """
+        cache_key = (table_name, tuple(key_fields))
+        with self._transaction_guard:
+            if self._transaction_depth > 0 and cache_key in self._transaction_indices:
+                return self._transaction_indices[cache_key]
+
+        index = {}
         for idx, existing in enumerate(records):
-            if all(existing.get(k) == record.get(k) for k in key_fields):
-                existing_idx = idx
-                break
-
-        if existing_idx is not None:
-            records[existing_idx] = record
+            index.setdefault(tuple(existing.get(k) for k in key_fields), idx)
+
+        with self._transaction_guard:
+            if self._transaction_depth > 0:
+                self._transaction_indices[cache_key] = index
+        return index
+
+    def flush(self):
+        """Write every table changed in the open transaction to disk now."""
+        with self._transaction_guard:
+            for table_name in sorted(self._transaction_dirty):
+                self._dump_table(table_name, self._transaction_tables[table_name])
+            self._transaction_dirty = set()
+            for table_name in sorted(self._transaction_appends):
+                self._append_table(table_name, self._pending_appends(table_name))
+
+    @contextmanager
+    def transaction(self):
+        """
+        Buffer every table write made inside the block and flush each changed
+        table to disk once when the outermost block exits. If the block raises,
+        the buffered writes are discarded and the tables are left untouched.
+
+        Usage:
+            with storage.transaction():
+                storage.insert_match(match_data)
+                storage.insert_kills(kills_data)
+        """
+        with self._transaction_guard:
+            self._transaction_depth += 1
+
+        committed = False
+        try:
+            yield self
+            committed = True
+        finally:
+            with self._transaction_guard:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    try:
+                        if committed:
+                            self.flush()
+                        else:
+                            logger.warning("Transaction failed, discarding buffered table writes")
+                    finally:
+                        self._transaction_tables = {}
+                        self._transaction_dirty = set()
+                        self._transaction_indices = {}
+                        self._transaction_appends = {}
+
+    def _upsert_records(self, table_name: str, new_records: List[Dict[str, Any]], key_fields: List[str]):
+        """
+        Insert or update many records with a single read and write.
+
+        Same result as upserting each record in order (the first row with a
+        matching key is replaced), but existing rows are located through a
+        key index instead of a scan.
+        """
+        if not new_records:
+            return
+
+        with self._table_lock(table_name):
+            records = self._read_table(table_name)
+            index = self._key_index(table_name, records, key_fields)
+            # Only this index is kept current below
+            self._drop_key_indices(table_name, keep=(table_name, tuple(key_fields)))
+
+            for record in new_records:
+                key = tuple(record.get(k) for k in key_fields)
+                existing_idx = index.get(key)
+                if existing_idx is not None:
+                    records[existing_idx] = record
+                else:
+                    index[key] = len(records)
+                    records.append(record)
+
+            self._write_table(table_name, records)
+
+    def _insert_records(self, table_name: str, new_records: List[Dict[str, Any]]):
+        """
+        Insert many new records (no upsert). Outside a transaction the table
+        is rewritten atomically, since other readers (like the stattrak
+        server) may parse the file at any time. Inside a transaction,
+        append-only tables are never read back: the records are buffered and
+        appended to the file in place when the transaction commits.
+        """
+        if not new_records:
+            return
+
+        with self._table_lock(table_name):
+            with self._transaction_guard:
+                if self._transaction_depth == 0:
+                    self._dump_table(table_name, self._load_table(table_name) + new_records)
+                    return
+                if table_name not in self._transaction_tables:
+                    self._transaction_appends.setdefault(table_name, []).extend(new_records)
+                    return
+
+            records = self._read_table(table_name)
+            self._drop_key_indices(table_name)
+            records.extend(new_records)
+            self._write_table(table_name, records)
+
+    def insert_many(self, table_name: str, records: List[Dict[str, Any]], key_fields: Optional[List[str]] = None):
+        """
+        Write many records to a table with one read and one write.
+
+        With key_fields, records are upserted on those fields; without, they
+        are appended as-is. Records of a sharded table are routed to the
+        shard of their match.
+        """
+        if table_name in self.sharded_tables:
+            by_match = {}
+            for record in records:
+                by_match.setdefault(record.get('match_id'), []).append(record)
+            for match_id, match_records in by_match.items():
+                self.insert_many(self._shard_name(table_name, match_id), match_records, key_fields)
+            return
+        if key_fields:
+            self._upsert_records(table_name, records, key_fields)
         else:
-            records.append(record)
+            self._insert_records(table_name, records)
 
-        self._write_table(table_name, records)
-
-    def _insert_record(self, table_name: str, record: Dict[str, Any]):
-        """Insert a new record (no upsert)."""
-        records = self._read_table(table_name)
-        records.append(record)
-        self._write_table(table_name, records)
+    def replay(self, writes: List[tuple]):
+        """Apply (table_name, records, key_fields) writes recorded by a DeferredStorage."""
+        for table_name, records, key_fields in writes:
+            self.insert_many(table_name, records, key_fields)
 
     # =========================================================================
     # Table-specific methods matching StatsInserter expectations
@@ -84,137 +405,192 @@ class FileStorage:
 
     def insert_match(self, match_data: Dict[str, Any]) -> bool:
         """Insert match metadata."""
-        # Add created_at timestamp
-        match_data['created_at'] = datetime.now().isoformat()
-        self._upsert_record('matches', match_data, ['match_id'])
+        # Add created_at timestamp unless the caller already stamped the match
+        if 'created_at' not in match_data:
+            match_data['created_at'] = datetime.now().isoformat()
+        self.insert_many('matches', [match_data], ['match_id'])
         logger.info(f"Inserted match {match_data.get('match_id')}")
         return True
 
     def insert_player_match(self, player_data: Dict[str, Any]):
         """Insert player match stats."""
-        self._upsert_record('player_matches', player_data, ['match_id', 'steam_id'])
+        self.insert_many('player_matches', [player_data], ['match_id', 'steam_id'])
 
     def insert_round(self, round_data: Dict[str, Any]):
         """Insert round data."""
-        self._upsert_record('rounds', round_data, ['match_id', 'round_number'])
+        self.insert_many('rounds', [round_data], ['match_id', 'round_number'])
 
     def insert_kill(self, kill_data: Dict[str, Any]):
         """Insert kill event."""
-        self._insert_record('kills', kill_data)
+        self.insert_many('kills', [kill_data])
 
     def insert_weapon_stat(self, weapon_data: Dict[str, Any]):
         """Insert weapon stats."""
-        self._upsert_record('weapon_stats', weapon_data, ['match_id', 'steam_id', 'weapon'])
+        self.insert_many('weapon_stats', [weapon_data], ['match_id', 'steam_id', 'weapon'])
 
     def insert_flash_stat(self, flash_data: Dict[str, Any]):
         """Insert flash stats."""
-        self._upsert_record('flash_stats', flash_data, ['match_id', 'steam_id'])
+        self.insert_many('flash_stats', [flash_data], ['match_id', 'steam_id'])
 
     def insert_damage_stat(self, damage_data: Dict[str, Any]):
         """Insert damage stats."""
-        self._upsert_record('damage_stats', damage_data, ['match_id', 'steam_id'])
+        self.insert_many('damage_stats', [damage_data], ['match_id', 'steam_id'])
 
     def insert_clutch_stat(self, clutch_data: Dict[str, Any]):
         """Insert clutch stats."""
-        self._upsert_record('clutch_stats', clutch_data, ['match_id', 'steam_id'])
+        self.insert_many('clutch_stats', [clutch_data], ['match_id', 'steam_id'])
 
     def insert_multikill_stat(self, multikill_data: Dict[str, Any]):
         """Insert multikill stats."""
-        self._upsert_record('multikill_stats', multikill_data, ['match_id', 'steam_id'])
+        self.insert_many('multikill_stats', [multikill_data], ['match_id', 'steam_id'])
 
     def insert_first_blood_stat(self, first_blood_data: Dict[str, Any]):
         """Insert first blood stats."""
-        self._upsert_record('first_blood_stats', first_blood_data, ['match_id', 'steam_id'])
+        self.insert_many('first_blood_stats', [first_blood_data], ['match_id', 'steam_id'])
 
     def insert_chat_message(self, chat_data: Dict[str, Any]):
         """Insert chat message (upsert by match_id + tick + steam_id)."""
-        self._upsert_record('chat_messages', chat_data, ['match_id', 'tick', 'steam_id'])
+        self.insert_many('chat_messages', [chat_data], ['match_id', 'tick', 'steam_id'])
+
+    # =========================================================================
+    # Bulk variants: one table read/write per call instead of per record
+    # =========================================================================
+
+    def insert_player_matches(self, players_data: List[Dict[str, Any]]):
+        """Insert player match stats for many players."""
+        self.insert_many('player_matches', players_data, ['match_id', 'steam_id'])
+
+    def insert_rounds(self, rounds_data: List[Dict[str, Any]]):
+        """Insert many rounds."""
+        self.insert_many('rounds', rounds_data, ['match_id', 'round_number'])
+
+    def insert_kills(self, kills_data: List[Dict[str, Any]]):
+        """Insert many kill events."""
+        self.insert_many('kills', kills_data)
+
+    def insert_weapon_stats(self, weapon_data: List[Dict[str, Any]]):
+        """Insert many weapon stats."""
+        self.insert_many('weapon_stats', weapon_data, ['match_id', 'steam_id', 'weapon'])
+
+    def insert_flash_stats(self, flash_data: List[Dict[str, Any]]):
+        """Insert many flash stats."""
+        self.insert_many('flash_stats', flash_data, ['match_id', 'steam_id'])
+
+    def insert_damage_stats(self, damage_data: List[Dict[str, Any]]):
+        """Insert many damage stats."""
+        self.insert_many('damage_stats', damage_data, ['match_id', 'steam_id'])
+
+    def insert_clutch_stats(self, clutch_data: List[Dict[str, Any]]):
+        """Insert many clutch stats."""
+        self.insert_many('clutch_stats', clutch_data, ['match_id', 'steam_id'])
+
+    def insert_multikill_stats(self, multikill_data: List[Dict[str, Any]]):
+        """Insert many multikill stats."""
+        self.insert_many('multikill_stats', multikill_data, ['match_id', 'steam_id'])
+
+    def insert_first_blood_stats(self, first_blood_data: List[Dict[str, Any]]):
+        """Insert many first blood stats."""
+        self.insert_many('first_blood_stats', first_blood_data, ['match_id', 'steam_id'])
+
+    def insert_chat_messages(self, chat_data: List[Dict[str, Any]]):
+        """Insert many chat messages (upsert by match_id + tick + steam_id)."""
+        self.insert_many('chat_messages', chat_data, ['match_id', 'tick', 'steam_id'])
 
     # =========================================================================
     # Query methods for reading data
     # =========================================================================
 
+    def _iter_table(self, table_name: str):
+        """
+        Iterate over a table's records. With ijson the file is streamed, so
+        filtered queries never hold the whole table in memory; buffered
+        tables inside a transaction are read from memory. Streaming raises
+        one of STREAM_ERRORS on files the strict parser rejects (bare NaN).
+        """
+        with self._transaction_guard:
+            buffered = self._transaction_depth > 0
+        path = self._get_table_path(table_name)
+        if buffered or not IJSON_AVAILABLE or not os.path.exists(path):
+            yield from self._read_table(table_name)
+            return
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+
+    def _filter_table(self, table_name: str, **filters) -> List[Dict[str, Any]]:
+        """
+        Records of a table matching every filter that is set. For a sharded
+        table filtered by match_id only that match's shard is read.
+        """
+        active = [(field, value) for field, value in filters.items() if value]
+        records = []
+        for name in self._partition_names(table_name, filters.get('match_id')):
+            try:
+                matched = [r for r in self._iter_table(name) if all(r.get(f) == v for f, v in active)]
+            except STREAM_ERRORS:
+                matched = [r for r in self._read_table(name) if all(r.get(f) == v for f, v in active)]
+            records.extend(matched)
+        return records
+
     def get_all_matches(self) -> List[Dict[str, Any]]:
-        """Get all matches."""
-        return self._read_table('matches')
+        """Get all matches (parsed once while matches.json is unchanged)."""
+        return self._cached_read_table('matches')
 
     def get_match(self, match_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific match by ID."""
-        matches = self._read_table('matches')
-        for match in matches:
-            if match.get('match_id') == match_id:
-                return match
-        return None
+        try:
+            return next((m for m in self._iter_table('matches') if m.get('match_id') == match_id), None)
+        except STREAM_ERRORS:
+            return next((m for m in self._read_table('matches') if m.get('match_id') == match_id), None)
 
     def get_player_matches(self, match_id: str = None, steam_id: str = None) -> List[Dict[str, Any]]:
         """Get player match stats, optionally filtered."""
-        records = self._read_table('player_matches')
-        if match_id:
-            records = [r for r in records if r.get('match_id') == match_id]
-        if steam_id:
-            records = [r for r in records if r.get('steam_id') == steam_id]
-        return records
+        return self._filter_table('player_matches', match_id=match_id, steam_id=steam_id)
 
     def get_rounds(self, match_id: str) -> List[Dict[str, Any]]:
         """Get rounds for a match."""
-        records = self._read_table('rounds')
-        return [r for r in records if r.get('match_id') == match_id]
+        return self._filter_table('rounds', match_id=match_id)
 
     def get_kills(self, match_id: str) -> List[Dict[str, Any]]:
         """Get kills for a match."""
-        records = self._read_table('kills')
-        return [r for r in records if r.get('match_id') == match_id]
+        return self._filter_table('kills', match_id=match_id)
 
     def get_weapon_stats(self, match_id: str = None, steam_id: str = None) -> List[Dict[str, Any]]:
         """Get weapon stats, optionally filtered."""
-        records = self._read_table('weapon_stats')
-        if match_id:
-            records = [r for r in records if r.get('match_id') == match_id]
-        if steam_id:
-            records = [r for r in records if r.get('steam_id') == steam_id]
-        return records
+        return self._filter_table('weapon_stats', match_id=match_id, steam_id=steam_id)
 
     def get_flash_stats(self, match_id: str = None, steam_id: str = None) -> List[Dict[str, Any]]:
         """Get flash stats, optionally filtered."""
-        records = self._read_table('flash_stats')
-        if match_id:
-            records = [r for r in records if r.get('match_id') == match_id]
-        if steam_id:
-            records = [r for r in records if r.get('steam_id') == steam_id]
-        return records
+        return self._filter_table('flash_stats', match_id=match_id, steam_id=steam_id)
 
     def get_chat_messages(self, match_id: str = None, steam_id: str = None) -> List[Dict[str, Any]]:
         """Get chat messages, optionally filtered."""
-        records = self._read_table('chat_messages')
-        if match_id:
-            records = [r for r in records if r.get('match_id') == match_id]
-        if steam_id:
-            records = [r for r in records if r.get('steam_id') == steam_id]
+        records = self._filter_table('chat_messages', match_id=match_id, steam_id=steam_id)
         return sorted(records, key=lambda x: x.get('tick', 0))
 
     def get_clutch_stats(self, match_id: str = None, steam_id: str = None) -> List[Dict[str, Any]]:
         """Get clutch stats, optionally filtered."""
-        records = self._read_table('clutch_stats')
-        if match_id:
-            records = [r for r in records if r.get('match_id') == match_id]
-        if steam_id:
-            records = [r for r in records if r.get('steam_id') == steam_id]
-        return records
+        return self._filter_table('clutch_stats', match_id=match_id, steam_id=steam_id)
 
     def get_multikill_stats(self, match_id: str = None, steam_id: str = None) -> List[Dict[str, Any]]:
         """Get multikill stats, optionally filtered."""
-        records = self._read_table('multikill_stats')
-        if match_id:
-            records = [r for r in records if r.get('match_id') == match_id]
-        if steam_id:
-            records = [r for r in records if r.get('steam_id') == steam_id]
-        return records
+        return self._filter_table('multikill_stats', match_id=match_id, steam_id=steam_id)
 
     def get_first_blood_stats(self, match_id: str = None, steam_id: str = None) -> List[Dict[str, Any]]:
         """Get first blood stats, optionally filtered."""
-        records = self._read_table('first_blood_stats')
-        if match_id:
-            records = [r for r in records if r.get('match_id') == match_id]
-        if steam_id:
-            records = [r for r in records if r.get('steam_id') == steam_id]
-        return records
+        return self._filter_table('first_blood_stats', match_id=match_id, steam_id=steam_id)
+
+
+class DeferredStorage(FileStorage):
+    """
+    FileStorage that records writes instead of performing them. Lets demos be
+    parsed in worker processes while a single parent process owns the table
+    files: workers return .writes and the parent applies them with replay().
+    """
+
+    def __init__(self, tables_dir: str = TABLES_DIR):
+        super().__init__(tables_dir)
+        self.writes: List[tuple] = []
+
+    def insert_many(self, table_name: str, records: List[Dict[str, Any]], key_fields: Optional[List[str]] = None):
+        """Record the write for a later replay()."""
+        self.writes.append((table_name, list(records), key_fields))
@@ -2,13 +2,23 @@ import requests
 from requests.adapters import HTTPAdapter, Retry
 
 import os
+import sys
+import time
 import logging as logger
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from db_utils import Connect
-from json import load,loads
-from time import sleep
+from json import load
+from select import select
 
 logger.basicConfig(format='[%(asctime)s] %(levelname)s %(name)s: %(message)s', level=logger.DEBUG)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.info("orjson not installed. Steam API responses will be parsed with the stdlib json module.")
+
 # Get codes
 homedir    = os.path.expanduser('~')
 steam_conf = open(os.path.join(homedir,'.ssh/steam_api.json'),'r')
@@ -17,14 +27,118 @@ steam_dict = load(steam_conf)
 # Internal to our Org
 api_key    = steam_dict.get('api_key')
 
+NEXT_MATCH_SHARING_CODE_URL = 'https://api.steampowered.com/ICSGOPlayers_730/GetNextMatchSharingCode/v1'
+
+# Users whose match chains are walked concurrently
+USER_WORKERS = 8
+
+# Channel notified with a steam_id when that user's match auth is added or
+# changed; notified users are searched right away
+NOTIFY_CHANNEL = 'matches_to_check'
+
+# Users not searched for this long are stale and swept for matches played
+# since; sweeps are at least MIN_SWEEP_INTERVAL_SECONDS apart, so users whose
+# search keeps failing (and so stay stale) are retried at the old poll rate
+STALE_AFTER_SECONDS        = 60
+MIN_SWEEP_INTERVAL_SECONDS = 5
+
 # Get DB connection
 db = Connect()
 
-# Get HTTPS request session with retries on Too Many Requests for URL 429
+def install_trigger():
+    """
+    One-off schema setup, run with --install-trigger by a role with DDL
+    privileges: the updated_ts index used by iter_over_users and the trigger
+    that notifies NOTIFY_CHANNEL when a user's auth code is added or changed
+    """
+
+    logger.info('Installing latest_match_auth index and notify trigger..')
+    # iter_over_users polls the oldest rows by updated_ts; index them so each
+    # poll is an index scan rather than a sort of the whole table
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_latest_match_auth_updated_ts
+        ON users.latest_match_auth (updated_ts);
+    """
+              ,returns = False)
+
+    # Notify the detector as soon as a user's auth code is registered or
+    # changed, so new users are searched without waiting for the stale sweep
+    db.execute(f"""
+        CREATE OR REPLACE FUNCTION users.notify_matches_to_check() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{NOTIFY_CHANNEL}', CAST(NEW.steam_id AS text));
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS latest_match_auth_notify ON users.latest_match_auth;
+
+        CREATE TRIGGER latest_match_auth_notify
+        AFTER INSERT OR UPDATE OF game_auth_code ON users.latest_match_auth
+        FOR EACH ROW EXECUTE PROCEDURE users.notify_matches_to_check();
+    """
+              ,returns = False)
+
+# Get HTTPS request session with retries on Too Many Requests for URL 429,
+# pooling one connection per concurrent user walk
 s       = requests.Session()
 retries = Retry(total=5, backoff_factor=1, status_forcelist=[ 429, 502, 503, 504 ])
-s.mount('https://', HTTPAdapter(max_retries=retries))
+s.mount('https://', HTTPAdapter(max_retries=retries, pool_maxsize=USER_WORKERS))
+
+
+def save_user_walk(steam_id: str, new_match_share_codes: list, latest_match_share_code: str, reached_end: bool):
+    """
+    Queue the fresh match codes found by a walk and record where it got to
+    :param steam_id: Steam User ID
+    :param new_match_share_codes: Fresh match codes in the order they were found
+    :param latest_match_share_code: Last code before n/a, if the walk reached it
+    :param reached_end: True if the walk reached n/a, False if it stopped early
+    """
+
+    if new_match_share_codes:
+        sql = """
+            INSERT INTO matches.queue (queue_id, time_inserted, steam_id, match_share_code)
+            SELECT
+                 gen_random_uuid()
+                ,current_timestamp
+                ,:steam_id
+                ,new_code.match_share_code
+            FROM unnest(CAST(:match_share_codes AS text[])) WITH ORDINALITY AS new_code(match_share_code, ord)
+            ORDER BY new_code.ord
+            ;
+        """
+        db.execute(sql
+                  ,params  = {
+                       'steam_id':steam_id
+                      ,'match_share_codes':new_match_share_codes
+                      }
+                  ,returns = False)
 
+    if reached_end:
+        sql = """
+            UPDATE users.latest_match_auth
+            SET updated_ts = current_timestamp, match_share_code = :match_share_code
+            WHERE steam_id = :steam_id;
+        """
+        db.execute(sql
+                  ,params  = {
+                       'steam_id':steam_id
+                      ,'match_share_code':latest_match_share_code
+                      }
+                  ,returns = False)
+    elif new_match_share_codes:
+        # Resume the unfinished walk from the last queued code
+        sql = """
+            UPDATE users.latest_match_auth
+            SET match_share_code = :match_share_code
+            WHERE steam_id = :steam_id;
+        """
+        db.execute(sql
+                  ,params  = {
+                       'steam_id':steam_id
+                      ,'match_share_code':new_match_share_codes[-1]
+                      }
+                  ,returns = False)
 
 def find_user_latest_match(game_auth_code: str, steam_id: str, match_share_code: str, max_iterations=100, **kwarsg):
     """
@@ -39,96 +153,174 @@ def find_user_latest_match(game_auth_code: str, steam_id: str, match_share_code:
     """
 
     i = 0
-    while match_share_code != 'n/a':
+    # Fresh match codes, queued with a single insert when the walk ends. If the
+    # walk stops early (error or iteration limit) the codes found so far are
+    # still queued and the walk resumes from the last of them next time
+    new_match_share_codes = []
+    reached_end = False
+    try:
+        while match_share_code != 'n/a':
 
-        # emergency end condition
-        i += 1
-        if i >= max_iterations:
-            raise ValueError(f'Error: reached {max_iterations} iterations without receiving \'n/a\' result')
+            # emergency end condition
+            i += 1
+            if i >= max_iterations:
+                raise ValueError(f'Error: reached {max_iterations} iterations without receiving \'n/a\' result')
 
-        most_recent_game = match_share_code
+            most_recent_game = match_share_code
 
+            try:
+                # TO_DO: rate limit retry logic
+                logger.info(f'Requesting API...')
+                raw_response = s.get(NEXT_MATCH_SHARING_CODE_URL
+                                    ,params = {
+                                         'key':api_key
+                                        ,'steamid':steam_id
+                                        ,'steamidkey':game_auth_code
+                                        ,'knowncode':match_share_code
+                                        })
+                raw_response.raise_for_status()
+            except requests.exceptions.HTTPError as errh:
+                logger.error(errh)
+                raise
+
+            # Parse the body bytes directly rather than decoding them to text first
+            response        = orjson.loads(raw_response.content) if ORJSON_AVAILABLE else raw_response.json()
+
+            match_share_code = response.get('result').get('nextcode')
+
+            if match_share_code == 'n/a':
+                logger.info(f'Found n/a for {steam_id}')
+                reached_end = True
+            else:
+                logger.info(f'Found fresh match {match_share_code} for {steam_id}')
+                new_match_share_codes.append(match_share_code)
+    except Exception:
+        # Keep the codes found so far; a failure saving them is logged so the
+        # walk's own error is the one that propagates
         try:
-            # TO_DO: rate limit retry logic
-            logger.info(f'Requesting API...')
-            raw_response = s.get(f'https://api.steampowered.com/ICSGOPlayers_730/GetNextMatchSharingCode/v1?key={api_key}&steamid={steam_id}&steamidkey={game_auth_code}&knowncode={match_share_code}')
-            raw_response.raise_for_status()
-        except requests.exceptions.HTTPError as errh:
-            logger.error(errh)
-            raise
-
-        response        = loads(raw_response.text)
-
-        match_share_code = response.get('result').get('nextcode')
-
-        if match_share_code == 'n/a':
-
-            logger.info(f'Found n/a for {steam_id}')
-
-            sql = """
-                UPDATE users.latest_match_auth
-                SET updated_ts = current_timestamp, match_share_code = :match_share_code
-                WHERE steam_id = :steam_id;
-            """
-            db.execute(sql
-                      ,params  = {
-                           'steam_id':steam_id
-                          ,'match_share_code':most_recent_game
-                          }
-                      ,returns = False)
-        else:
-
-            logger.info(f'Found fresh match {match_share_code} for {steam_id}')
-
-            sql = """
-                INSERT INTO matches.queue (queue_id, time_inserted, steam_id, match_share_code)
-                SELECT
-                     gen_random_uuid()
-                    ,current_timestamp
-                    ,:steam_id
-                    ,:match_share_code
-                ;
-            """
-            db.execute(sql
-                      ,params  = {
-                           'steam_id':steam_id
-                          ,'match_share_code':match_share_code
-                          }
-                      ,returns = False)
+            save_user_walk(steam_id, new_match_share_codes, None, reached_end=False)
+        except Exception as e:
+            logger.error(f'Failed to save partial walk for user {steam_id}: {e}')
+        raise
+
+    save_user_walk(steam_id, new_match_share_codes, most_recent_game, reached_end)
 
     return i, most_recent_game
 
+def search_users(sql: str, params: dict = {}):
+    """
+    Find the latest match of every user selected by sql
+    :param sql: Query returning game_auth_code, steam_id and match_share_code
+    :param params: Dict storing strings to be safely passed to query
+    """
+
+    # Each user's chain is serial, but the API waits of different users overlap
+    with ThreadPoolExecutor(max_workers=USER_WORKERS) as executor:
+        futures = {}
+        for user in db.execute_rows(sql, params):
+            logger.info(f'Finding user {user.steam_id} latest match')
+            future = executor.submit(find_user_latest_match, user.game_auth_code, user.steam_id, user.match_share_code)
+            futures[future] = user.steam_id
+
+        for future in as_completed(futures):
+            steam_id       = futures[future]
+            try:
+                api_calls, res = future.result()
+            except Exception as e:
+                logger.error(f'Failed to find latest match for user {steam_id}: {e}')
+                continue
+            if api_calls == 1:
+                logger.info(f'No new matches found for user {steam_id}, last was {res}')
+            else:
+                logger.info(f'User {steam_id} took {str(api_calls)} Steam Web API requests to find latest match {res}')
+
 def iter_over_users():
     """
     Insert into queue and update latest match table based on SteamWeb API response
     """
 
-    logger.info(f'Get 100 oldest users to check up on..')
-    # Get 100 oldest rows, add filter to only online users for streamlined run
+    logger.info(f'Get users not searched for {STALE_AFTER_SECONDS} seconds to check up on..')
+    # Get every stale row, oldest first; updated_ts is indexed
     sql = """
     SELECT 
          game_auth_code
         ,steam_id
         ,match_share_code
     FROM users.latest_match_auth
-    ORDER BY updated_ts ASC
-    LIMIT 100
+    WHERE updated_ts IS NULL
+       OR updated_ts < current_timestamp - CAST(:stale_after_seconds AS integer) * interval '1 second'
+    ORDER BY updated_ts ASC NULLS FIRST
     ;
     """
-    df = db.execute(sql)
-
-    for user in df.itertuples(index=True, name='Pandas'):
-        logger.info(f'Finding user {user.steam_id} latest match')
-        api_calls, res = find_user_latest_match(user.game_auth_code, user.steam_id, user.match_share_code)
-        if api_calls == 1:
-            logger.info(f'No new matches found for user {user.steam_id}, last was {res}')
-        else:
-            logger.info(f'User {user.steam_id} took {str(api_calls)} Steam Web API requests to find latest match {res}')
+    search_users(sql, params = {'stale_after_seconds':STALE_AFTER_SECONDS})
     
-    logger.info('Finished finding and updating for top 100 users')
+    logger.info('Finished finding and updating for stale users')
+
+def seconds_until_next_stale():
+    """
+    Returns seconds until the least recently searched user becomes stale
+    (STALE_AFTER_SECONDS if there are no users)
+    """
+
+    sql = """
+    SELECT EXTRACT(EPOCH FROM (
+        min(updated_ts) + CAST(:stale_after_seconds AS integer) * interval '1 second' - current_timestamp
+    )) AS wait_seconds
+    FROM users.latest_match_auth
+    ;
+    """
+    for row in db.execute_rows(sql, params = {'stale_after_seconds':STALE_AFTER_SECONDS}):
+        if row.wait_seconds is not None:
+            return float(row.wait_seconds)
+    return STALE_AFTER_SECONDS
+
+def iter_over_notified_users(steam_ids: set):
+    """
+    Insert into queue and update latest match table for the users named in
+    NOTIFY_CHANNEL payloads
+    :param steam_ids: Steam User IDs received as notification payloads
+    """
+
+    logger.info(f'Searching {len(steam_ids)} notified user(s)..')
+    # The ids are sent as an untyped array literal, which Postgres reads as
+    # an array of steam_id's own type, so the comparison can use its index
+    sql = """
+    SELECT
+         game_auth_code
+        ,steam_id
+        ,match_share_code
+    FROM users.latest_match_auth
+    WHERE steam_id = ANY(:steam_ids)
+    ;
+    """
+    steam_ids_literal = '{' + ','.join(f'"{steam_id}"' for steam_id in sorted(steam_ids)) + '}'
+    search_users(sql, params = {'steam_ids':steam_ids_literal})
+
+if '--install-trigger' in sys.argv:
+    install_trigger()
+    sys.exit(0)
+
+# Autocommit connection that LISTENs for user changes. The pool proxy is kept
+# checked out for the life of the loop: if it were garbage collected its
+# psycopg2 connection would be closed or handed back to the query pool
+listen_proxy      = db.connection.raw_connection()
+listen_connection = listen_proxy.driver_connection
+listen_connection.autocommit = True
+with listen_connection.cursor() as cursor:
+    cursor.execute(f'LISTEN {NOTIFY_CHANNEL};')
 
 while True:
-    logger.info('Waiting 5 seconds...')
-    sleep(5)
     logger.info('Starting search')
-    iter_over_users()
\ No newline at end of file
+    iter_over_users()
+
+    # Sleep until the next user goes stale, waking early for notified users
+    next_sweep = time.monotonic() + max(MIN_SWEEP_INTERVAL_SECONDS, seconds_until_next_stale())
+    while (timeout := next_sweep - time.monotonic()) > 0:
+        logger.info(f'Waiting up to {timeout:.0f} seconds for {NOTIFY_CHANNEL}...')
+        # Wakes early when a notification arrives on the LISTEN socket
+        if select([listen_connection], [], [], timeout) != ([], [], []):
+            listen_connection.poll()
+            steam_ids = {notify.payload for notify in listen_connection.notifies}
+            listen_connection.notifies.clear()
+            if steam_ids:
+                iter_over_notified_users(steam_ids)
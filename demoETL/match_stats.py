@@ -1,5 +1,6 @@
-from math import sqrt
+import heapq
 import json 
+import numpy as np
 
 match_stats = [
     {
@@ -50,50 +51,65 @@ match_stats = [
     }
 ]
 
-def get_stat_types_list(match_stats:list):
-    stat_types = []
-    for key, value in match_stats[0].items():
-        if isinstance(value,(int, float)) and not isinstance(value,bool):
-            stat_types.append(key)
-    return stat_types
+# Numeric stats reported per user; user_name and user_team are labels
+STAT_TYPES = ('team_flash_count', 'blind_duration_sec_sum')
 
-def get_empty_stat_dict(match_stats:list):
+def get_stat_types_list(match_stats:list, stat_types:tuple = STAT_TYPES):
+    return [ stat_type for stat_type in stat_types if stat_type in match_stats[0] ]
+
+def get_empty_stat_dict(match_stats:list, stat_types:tuple = STAT_TYPES):
     stat_dict = {}
-    for stat_type in get_stat_types_list(match_stats):
+    for stat_type in get_stat_types_list(match_stats, stat_types):
         stat_dict[stat_type] = 0
     return stat_dict
 
-def get_average_stat_dict(match_stats:list):
-    stat_dict = get_empty_stat_dict(match_stats)
-    for user_stats in match_stats:
-        for stat_type in get_stat_types_list(match_stats):
-            stat_dict[stat_type] += user_stats.get(stat_type)
-    return { key:value/10.0 for key,value in stat_dict.items() }
+def get_stat_matrix(match_stats:list, stat_types:list):
+    # one row per user, one float64 column per stat type
+    return np.array([[user_stats.get(stat_type) for stat_type in stat_types] for user_stats in match_stats], dtype=np.float64)
 
-def get_standard_deviation_stat_dict(match_stats:list):
-    std_dev_stat_dict = get_empty_stat_dict(match_stats)
-    avg_stat_dict     = get_average_stat_dict(match_stats)
-    for user_stats in match_stats:
-        for stat_type in get_stat_types_list(match_stats):
-            std_dev_stat_dict[stat_type] += (user_stats.get(stat_type) - avg_stat_dict.get(stat_type)) ** 2
-    return { key:sqrt(value/10.0) for key,value in std_dev_stat_dict.items() }
-
-def get_zscore_stat_dict(match_stats:list):
-    zscore_stat_dict  = {}
-    avg_stat_dict     = get_average_stat_dict(match_stats)
-    std_dev_stat_dict = get_standard_deviation_stat_dict(match_stats)
-    for user_stats in match_stats:
-        zscore_stat_dict[user_stats.get('user_name')] = {}
-        for stat_type in get_stat_types_list(match_stats):
-            zscore_stat_dict[user_stats.get('user_name')][stat_type] = (user_stats.get(stat_type) - avg_stat_dict.get(stat_type))/std_dev_stat_dict.get(stat_type)
-    return zscore_stat_dict
+def get_average_stats(stat_matrix):
+    return stat_matrix.mean(axis=0)
+
+def get_standard_deviation_stats(stat_matrix, average_stats=None):
+    if average_stats is None:
+        average_stats = get_average_stats(stat_matrix)
+    # population standard deviation over the players actually in the match
+    return np.sqrt(((stat_matrix - average_stats) ** 2).mean(axis=0))
+
+def get_zscore_matrix(stat_matrix):
+    avg_stats = get_average_stats(stat_matrix)
+    return (stat_matrix - avg_stats)/get_standard_deviation_stats(stat_matrix, avg_stats)
+
+def get_average_stat_dict(match_stats:list, stat_types:tuple = STAT_TYPES):
+    stat_types = get_stat_types_list(match_stats, stat_types)
+    return dict(zip(stat_types, get_average_stats(get_stat_matrix(match_stats, stat_types)).tolist()))
+
+def get_standard_deviation_stat_dict(match_stats:list, stat_types:tuple = STAT_TYPES):
+    stat_types = get_stat_types_list(match_stats, stat_types)
+    return dict(zip(stat_types, get_standard_deviation_stats(get_stat_matrix(match_stats, stat_types)).tolist()))
 
+def get_zscore_stat_dict(match_stats:list, stat_types:tuple = STAT_TYPES):
+    stat_types   = get_stat_types_list(match_stats, stat_types)
+    zscores      = get_zscore_matrix(get_stat_matrix(match_stats, stat_types))
+    return { user_stats.get('user_name'):dict(zip(stat_types, user_zscores)) for user_stats, user_zscores in zip(match_stats, zscores.tolist()) }
 
-def get_most_outlier_stat(match_stats:list):
+def get_zscore_stat_tuple_list(match_stats:list, stat_types:tuple = STAT_TYPES):
+    # (user_name, stat_type, stat_value, zscore) for every user and stat
+    stat_types   = get_stat_types_list(match_stats, stat_types)
+    zscores      = get_zscore_matrix(get_stat_matrix(match_stats, stat_types))
+    zscore_stat_tuple_list = []
+    for user_stats, user_zscores in zip(match_stats, zscores.tolist()):
+        user_name = user_stats['user_name']
+        for stat_type, stat_zscore in zip(stat_types, user_zscores):
+            zscore_stat_tuple_list.append((user_name, stat_type, user_stats[stat_type], stat_zscore))
+    return zscore_stat_tuple_list
+
+
+def get_most_outlier_stat(match_stats:list, stat_types:tuple = STAT_TYPES):
     outlier_user   = ""
     outlier_type   = ""
     biggest_zscore = 0
-    zscore_stat_dict = get_zscore_stat_dict(match_stats)
+    zscore_stat_dict = get_zscore_stat_dict(match_stats, stat_types)
     for user_name, stats in zscore_stat_dict.items():
         for stat_type, stat_zscore in stats.items():
             if abs(stat_zscore) > abs(biggest_zscore):
@@ -102,19 +118,12 @@ def get_most_outlier_stat(match_stats:list):
                 biggest_zscore = stat_zscore
     return outlier_user, outlier_type, biggest_zscore
 
-def get_top_three_outlier_stat(match_stats:list):
-    outlier_users       = [""]*3
-    outlier_types  = [""]*3
-    biggest_zscores     = [0]*3
-    zscore_stat_dict = get_zscore_stat_dict(match_stats)
-    for user_name, stats in zscore_stat_dict.items():
-        for stat_type, stat_zscore in stats.items():
-            if abs(stat_zscore) > abs(biggest_zscore):
-
-    return outlier_user, outlier_type, biggest_zscore
+def get_top_n_outlier_stat(match_stats:list, n:int = 3, stat_types:tuple = STAT_TYPES):
+    # partial heap selection of the n largest |zscore| instead of a full sort
+    return heapq.nlargest(n, get_zscore_stat_tuple_list(match_stats, stat_types), key=lambda stat_tuple: abs(stat_tuple[3]))
 
-def get_outlier_stat_message(match_stats:list):
-    outlier_user, outlier_type, stat_zscore  = get_most_outlier_stat(match_stats)
+def get_outlier_stat_message(match_stats:list, stat_types:tuple = STAT_TYPES):
+    outlier_user, outlier_type, stat_zscore  = get_most_outlier_stat(match_stats, stat_types)
     for user_stats in match_stats:
         if outlier_user == user_stats.get('user_name'):
             return f"{outlier_user} had {'only' if stat_zscore < 0 else 'a whopping'} {user_stats.get(outlier_type)} {outlier_type}"
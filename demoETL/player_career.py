@@ -19,22 +19,45 @@ Usage:
 
 import json
 import logging
-from dataclasses import dataclass, field, asdict
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
 from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
-from statistics import mean, stdev
 import math
+import sys
+from operator import attrgetter
+
+import numpy as np
 
 from file_storage import FileStorage
 
 logger = logging.getLogger(__name__)
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.info("numba not installed. Career trends will be computed in pure Python.")
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.info("orjson not installed. Careers will be saved with the stdlib json module.")
+
 
 # =============================================================================
 # DATA STRUCTURES
 # =============================================================================
 
-@dataclass
+# Career records are created by the thousand in build_all_careers; slotted
+# instances are smaller and faster to read (dataclass slots need Python 3.10+)
+DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**DATACLASS_OPTIONS)
 class MatchPerformance:
     """Performance stats for a single match."""
     match_id: str
@@ -51,7 +74,7 @@ class MatchPerformance:
     kd: float
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class MatchSentiment:
     """Sentiment stats for a single match."""
     match_id: str
@@ -64,7 +87,7 @@ class MatchSentiment:
     dominant_sentiment: str
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class MatchFlashStats:
     """Flash stats for a single match."""
     match_id: str
@@ -78,7 +101,7 @@ class MatchFlashStats:
     efficiency: float  # enemies_flashed / flashes_thrown
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class CareerTrends:
     """Calculated trend slopes for career metrics."""
     kd_trend: float = 0.0           # + improving, - declining
@@ -90,7 +113,7 @@ class CareerTrends:
     team_flash_trend: float = 0.0   # - is good (fewer team flashes)
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class CareerAverages:
     """Lifetime career averages."""
     kd: float = 0.0
@@ -107,7 +130,7 @@ class CareerAverages:
     flash_efficiency: float = 0.0
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class CareerMilestones:
     """Notable career achievements and records."""
     best_kd_match: Optional[str] = None
@@ -126,7 +149,7 @@ class CareerMilestones:
     current_streak_type: str = ""  # "WIN" or "LOSS"
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class RecentForm:
     """Recent performance vs career average."""
     matches_analyzed: int = 5
@@ -142,7 +165,7 @@ class RecentForm:
     form_rating: str = "AVERAGE"  # "HOT", "AVERAGE", "COLD"
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class PlayerCareer:
     """Complete career profile for a player."""
     steam_id: str
@@ -150,6 +173,8 @@ class PlayerCareer:
     first_match_date: Optional[str] = None
     last_match_date: Optional[str] = None
     total_matches: int = 0
+    # Match that ends performance_history; saved careers are reused while it is current
+    last_match_id: Optional[str] = None
 
     # Timelines
     performance_history: List[MatchPerformance] = field(default_factory=list)
@@ -165,11 +190,54 @@ class PlayerCareer:
     # Map-specific stats
     map_stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
 
+    # Columnar float64 copies of performance_history's numeric fields (plus
+    # 'win' as 1/0), so trend maths runs over contiguous arrays
+    performance_columns: Dict[str, np.ndarray] = field(default_factory=dict, repr=False, compare=False)
+
+
+# Numeric MatchPerformance fields mirrored into PlayerCareer.performance_columns
+PERFORMANCE_COLUMNS = ('kills', 'deaths', 'assists', 'adr', 'headshot_pct', 'mvps', 'score', 'kd')
+
+# Match result encoded as +1 (win), -1 (loss) or 0 (tie) in the 'outcome' column
+RESULT_OUTCOMES = {'WIN': 1, 'LOSS': -1}
+
+
+def build_performance_columns(history: List[MatchPerformance]) -> Dict[str, np.ndarray]:
+    """Convert a performance timeline to one float64 array per numeric field."""
+    n = len(history)
+    columns = {
+        name: np.fromiter((getattr(p, name) for p in history), dtype=np.float64, count=n)
+        for name in PERFORMANCE_COLUMNS
+    }
+    columns['outcome'] = np.fromiter((RESULT_OUTCOMES.get(p.result, 0) for p in history), dtype=np.int8, count=n)
+    columns['win'] = (columns['outcome'] == 1).astype(np.float64)
+    return columns
+
 
 # =============================================================================
 # TREND CALCULATION
 # =============================================================================
 
+def _linear_trend_slope(values):
+    """
+    Least-squares slope of values against x = 0..n-1 (n >= 2) in one pass.
+    With x fixed, sum(x) and sum((x - x_mean)^2) have closed forms, so only
+    sum(y) and sum(x * y) are accumulated. Compiled with numba when available.
+    """
+    n = values.shape[0]
+    sum_y = 0.0
+    sum_xy = 0.0
+    for i in range(n):
+        sum_y += values[i]
+        sum_xy += i * values[i]
+    x_mean = (n - 1) / 2.0
+    return (sum_xy - x_mean * sum_y) / (n * (n * n - 1) / 12.0)
+
+
+if NUMBA_AVAILABLE:
+    _linear_trend_slope = njit(cache=True)(_linear_trend_slope)
+
+
 def calculate_linear_trend(values: List[float]) -> float:
     """
     Calculate the slope of a linear regression line.
@@ -182,19 +250,17 @@ def calculate_linear_trend(values: List[float]) -> float:
     if len(values) < 2:
         return 0.0
 
-    n = len(values)
-    x = list(range(n))
-
-    # Calculate means
-    x_mean = sum(x) / n
-    y_mean = sum(values) / n
+    # No copy when values is already a float64 column
+    values = np.asarray(values, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        return float(_linear_trend_slope(values))
 
-    # Calculate slope: sum((x - x_mean)(y - y_mean)) / sum((x - x_mean)^2)
-    numerator = sum((x[i] - x_mean) * (values[i] - y_mean) for i in range(n))
-    denominator = sum((x[i] - x_mean) ** 2 for i in range(n))
-
-    if denominator == 0:
-        return 0.0
+    # Same closed form as _linear_trend_slope:
+    # slope = (sum(x*y) - x_mean * sum(y)) / sum((x - x_mean)^2)
+    n = len(values)
+    x_mean = (n - 1) / 2
+    numerator = float(np.dot(np.arange(n), values)) - x_mean * float(values.sum())
+    denominator = n * (n * n - 1) / 12
 
     return numerator / denominator
 
@@ -204,12 +270,33 @@ def calculate_rolling_average(values: List[float], window: int = 5) -> List[floa
     if len(values) < window:
         return values
 
-    result = []
-    for i in range(len(values)):
-        start = max(0, i - window + 1)
-        result.append(mean(values[start:i + 1]))
+    # Window sums from one cumulative sum; the first window-1 entries average
+    # over the shorter prefix available so far
+    cumsum = np.concatenate(([0.0], np.cumsum(np.asarray(values, dtype=np.float64))))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(0, end - window)
 
-    return result
+    return ((cumsum[end] - cumsum[start]) / (end - start)).tolist()
+
+
+def calculate_streaks(outcomes: np.ndarray) -> Tuple[int, int, int]:
+    """
+    Longest win streak, longest loss streak and current streak (+ wins,
+    - losses, 0 after a tie) of a +1/-1/0 outcome sequence, from its runs
+    of equal outcomes rather than a per-match state machine.
+    """
+    if len(outcomes) == 0:
+        return 0, 0, 0
+
+    outcomes = np.asarray(outcomes, dtype=np.int64)
+    run_starts = np.flatnonzero(np.diff(outcomes, prepend=outcomes[0] + 1))
+    run_lengths = np.diff(np.append(run_starts, len(outcomes)))
+    run_outcomes = outcomes[run_starts]
+
+    longest_win = int(run_lengths[run_outcomes == 1].max(initial=0))
+    longest_loss = int(run_lengths[run_outcomes == -1].max(initial=0))
+    current = int(run_outcomes[-1] * run_lengths[-1])
+    return longest_win, longest_loss, current
 
 
 # =============================================================================
@@ -224,6 +311,53 @@ class PlayerCareerTracker:
     def __init__(self, storage: FileStorage = None):
         self.storage = storage or FileStorage()
         self._careers_cache: Dict[str, PlayerCareer] = {}
+        # (match_dates, match_maps) from the matches table, read on first use
+        self._match_meta_cache: Optional[Tuple[Dict[str, str], Dict[str, str]]] = None
+        # steam_id -> match_id -> chat message texts, read on first use
+        self._chat_index_cache: Optional[Dict[str, Dict[str, List[str]]]] = None
+        # steam_id -> player_matches records, read on first use
+        self._player_match_index_cache: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        # Chat sentiment analyzer shared by every career, created on first use
+        self._sentiment_analyzer = None
+
+    def _get_match_meta(self) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Match date and map by match_id, read from storage once per tracker."""
+        if self._match_meta_cache is None:
+            matches_table = self.storage.get_all_matches()
+            match_dates = {m['match_id']: m.get('played_at', m.get('created_at', '')) for m in matches_table}
+            match_maps = {m['match_id']: m.get('map', 'unknown') for m in matches_table}
+            self._match_meta_cache = (match_dates, match_maps)
+        return self._match_meta_cache
+
+    def _get_player_match_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Player match records grouped by player, read from storage once per tracker."""
+        if self._player_match_index_cache is None:
+            index: Dict[str, List[Dict[str, Any]]] = {}
+            for pm in self.storage._read_table('player_matches'):
+                index.setdefault(pm.get('steam_id'), []).append(pm)
+            self._player_match_index_cache = index
+        return self._player_match_index_cache
+
+    def _get_sentiment_analyzer(self):
+        """Keyword-based chat sentiment analyzer, created once per tracker (None if unavailable)."""
+        if self._sentiment_analyzer is None:
+            # Import here to avoid circular dependency
+            try:
+                from chat_sentiment import ChatSentimentAnalyzer
+            except ImportError:
+                logger.warning("chat_sentiment module not available")
+                return None
+            self._sentiment_analyzer = ChatSentimentAnalyzer(use_aws=False)  # Use fallback for speed
+        return self._sentiment_analyzer
+
+    def _get_chat_index(self) -> Dict[str, Dict[str, List[str]]]:
+        """Chat messages grouped by player and match, read from storage once per tracker."""
+        if self._chat_index_cache is None:
+            index: Dict[str, Dict[str, List[str]]] = {}
+            for msg in self.storage._read_table('chat_messages'):
+                index.setdefault(msg.get('steam_id'), {}).setdefault(msg.get('match_id'), []).append(msg.get('message', ''))
+            self._chat_index_cache = index
+        return self._chat_index_cache
 
     def get_player_career(
         self,
@@ -243,7 +377,7 @@ class PlayerCareerTracker:
             PlayerCareer with all historical data and calculated trends
         """
         # Get all matches for this player
-        player_matches = self.storage.get_player_matches(steam_id=steam_id)
+        player_matches = self._get_player_match_index().get(steam_id, [])
 
         if not player_matches:
             logger.warning(f"No matches found for player {steam_id}")
@@ -261,14 +395,16 @@ class PlayerCareerTracker:
 
         # Build performance history
         career.performance_history = self._build_performance_history(player_matches)
+        career.performance_columns = build_performance_columns(career.performance_history)
 
         if career.performance_history:
             career.first_match_date = career.performance_history[0].date
             career.last_match_date = career.performance_history[-1].date
+            career.last_match_id = career.performance_history[-1].match_id
 
         # Build sentiment history
         if include_sentiment:
-            career.sentiment_history = self._build_sentiment_history(steam_id)
+            career.sentiment_history = self._build_sentiment_history(steam_id, player_matches)
 
         # Build flash history
         if include_flashes:
@@ -289,9 +425,7 @@ class PlayerCareerTracker:
     ) -> List[MatchPerformance]:
         """Build chronological performance history."""
         # Get match dates for sorting
-        matches_table = self.storage.get_all_matches()
-        match_dates = {m['match_id']: m.get('played_at', m.get('created_at', '')) for m in matches_table}
-        match_maps = {m['match_id']: m.get('map', 'unknown') for m in matches_table}
+        match_dates, match_maps = self._get_match_meta()
 
         history = []
         for pm in player_matches:
@@ -319,65 +453,72 @@ class PlayerCareerTracker:
             ))
 
         # Sort by date
-        history.sort(key=lambda x: x.date)
+        history.sort(key=attrgetter('date'))
         return history
 
-    def _build_sentiment_history(self, steam_id: str) -> List[MatchSentiment]:
+    def _build_sentiment_history(
+        self,
+        steam_id: str,
+        player_matches: List[Dict[str, Any]]
+    ) -> List[MatchSentiment]:
         """Build sentiment history from chat messages."""
-        # Import here to avoid circular dependency
-        try:
-            from chat_sentiment import ChatSentimentAnalyzer
-        except ImportError:
-            logger.warning("chat_sentiment module not available")
+        analyzer = self._get_sentiment_analyzer()
+        if analyzer is None:
             return []
 
-        matches_table = self.storage.get_all_matches()
-        match_dates = {m['match_id']: m.get('played_at', m.get('created_at', '')) for m in matches_table}
+        match_dates, _ = self._get_match_meta()
 
         history = []
-        analyzer = ChatSentimentAnalyzer(use_aws=False)  # Use fallback for speed
 
-        # Get unique match IDs this player participated in
-        player_matches = self.storage.get_player_matches(steam_id=steam_id)
+        # Unique match IDs this player participated in
         match_ids = set(pm['match_id'] for pm in player_matches)
 
-        for match_id in match_ids:
-            # Get this player's messages in this match
-            all_messages = self.storage.get_chat_messages(match_id=match_id)
-            player_messages = [m for m in all_messages if m.get('steam_id') == steam_id]
-
-            if not player_messages:
+        # Gather this player's messages match by match, then score them all
+        # in one batch and reduce the scores per match
+        chat_match_ids = []
+        group_sizes = []
+        flat_messages = []
+        for match_id, player_messages in self._get_chat_index().get(steam_id, {}).items():
+            if match_id not in match_ids:
                 continue
 
-            # Analyze sentiment for each message
-            sentiments = []
-            for msg in player_messages:
-                sentiment = analyzer.analyze_sentiment(msg.get('message', ''))
-                sentiments.append(sentiment)
-
-            if sentiments:
-                avg_positive = mean(s.positive for s in sentiments)
-                avg_negative = mean(s.negative for s in sentiments)
-                avg_neutral = mean(s.neutral for s in sentiments)
-                toxic_count = sum(1 for s in sentiments if s.negative > 0.4)
-                toxicity = toxic_count / len(sentiments) * 100
-
-                # Determine dominant
-                scores = {'POSITIVE': avg_positive, 'NEGATIVE': avg_negative, 'NEUTRAL': avg_neutral}
-                dominant = max(scores, key=scores.get)
-
-                history.append(MatchSentiment(
-                    match_id=match_id,
-                    date=match_dates.get(match_id, ''),
-                    message_count=len(player_messages),
-                    avg_positive=round(avg_positive, 3),
-                    avg_negative=round(avg_negative, 3),
-                    avg_neutral=round(avg_neutral, 3),
-                    toxicity_score=round(toxicity, 1),
-                    dominant_sentiment=dominant
-                ))
-
-        history.sort(key=lambda x: x.date)
+            chat_match_ids.append(match_id)
+            group_sizes.append(len(player_messages))
+            flat_messages.extend(player_messages)
+
+        if not flat_messages:
+            return history
+
+        # Columns are positive, negative, neutral
+        scores = analyzer.analyze_batch(flat_messages)
+        group_ends = np.cumsum(group_sizes)
+        group_starts = group_ends - group_sizes
+        toxic_counts = np.add.reduceat(scores[:, 1] > 0.4, group_starts)
+
+        for match_id, start, end, toxic_count in zip(chat_match_ids, group_starts, group_ends, toxic_counts.tolist()):
+            message_count = int(end - start)
+            # fsum keeps the means exact enough that tied sentiments stay tied
+            avg_positive, avg_negative, avg_neutral = (
+                math.fsum(column) / message_count for column in scores[start:end].T
+            )
+            toxicity = toxic_count / message_count * 100
+
+            # Determine dominant
+            dominant_scores = {'POSITIVE': avg_positive, 'NEGATIVE': avg_negative, 'NEUTRAL': avg_neutral}
+            dominant = max(dominant_scores, key=dominant_scores.get)
+
+            history.append(MatchSentiment(
+                match_id=match_id,
+                date=match_dates.get(match_id, ''),
+                message_count=message_count,
+                avg_positive=round(avg_positive, 3),
+                avg_negative=round(avg_negative, 3),
+                avg_neutral=round(avg_neutral, 3),
+                toxicity_score=round(toxicity, 1),
+                dominant_sentiment=dominant
+            ))
+
+        history.sort(key=attrgetter('date'))
         return history
 
     def _build_flash_history(self, steam_id: str) -> List[MatchFlashStats]:
@@ -387,8 +528,7 @@ class PlayerCareerTracker:
         if not flash_records:
             return []
 
-        matches_table = self.storage.get_all_matches()
-        match_dates = {m['match_id']: m.get('played_at', m.get('created_at', '')) for m in matches_table}
+        match_dates, _ = self._get_match_meta()
 
         history = []
         for fr in flash_records:
@@ -408,7 +548,7 @@ class PlayerCareerTracker:
                 efficiency=round(efficiency, 2)
             ))
 
-        history.sort(key=lambda x: x.date)
+        history.sort(key=attrgetter('date'))
         return history
 
     def _calculate_career_averages(self, career: PlayerCareer) -> CareerAverages:
@@ -418,34 +558,34 @@ class PlayerCareerTracker:
         if not career.performance_history:
             return avg
 
-        perf = career.performance_history
-        n = len(perf)
+        columns = career.performance_columns or build_performance_columns(career.performance_history)
+        n = len(career.performance_history)
 
-        total_kills = sum(p.kills for p in perf)
-        total_deaths = sum(p.deaths for p in perf)
-        wins = sum(1 for p in perf if p.result == 'WIN')
+        total_kills = int(columns['kills'].sum())
+        total_deaths = int(columns['deaths'].sum())
+        wins = int(columns['win'].sum())
 
         avg.kd = round(total_kills / total_deaths, 2) if total_deaths > 0 else total_kills
-        avg.adr = round(mean(p.adr for p in perf), 1)
+        avg.adr = round(float(columns['adr'].mean()), 1)
         avg.win_rate = round(wins / n * 100, 1)
-        avg.headshot_pct = round(mean(p.headshot_pct for p in perf), 1)
+        avg.headshot_pct = round(float(columns['headshot_pct'].mean()), 1)
         avg.kills_per_match = round(total_kills / n, 1)
         avg.deaths_per_match = round(total_deaths / n, 1)
-        avg.mvps_per_match = round(sum(p.mvps for p in perf) / n, 1)
+        avg.mvps_per_match = round(float(columns['mvps'].sum()) / n, 1)
 
         # Sentiment averages
         if career.sentiment_history:
             sent = career.sentiment_history
-            avg.toxicity = round(mean(s.toxicity_score for s in sent), 1)
+            avg.toxicity = round(math.fsum(s.toxicity_score for s in sent) / len(sent), 1)
             avg.messages_per_match = round(sum(s.message_count for s in sent) / len(sent), 1)
 
         # Flash averages
         if career.flash_history:
             fl = career.flash_history
-            avg.enemies_flashed_per_match = round(mean(f.enemies_flashed for f in fl), 1)
-            avg.teammates_flashed_per_match = round(mean(f.teammates_flashed for f in fl), 1)
             total_enemies = sum(f.enemies_flashed for f in fl)
             total_thrown = sum(f.flashes_thrown for f in fl)
+            avg.enemies_flashed_per_match = round(total_enemies / len(fl), 1)
+            avg.teammates_flashed_per_match = round(sum(f.teammates_flashed for f in fl) / len(fl), 1)
             avg.flash_efficiency = round(total_enemies / total_thrown, 2) if total_thrown > 0 else 0
 
         return avg
@@ -455,14 +595,13 @@ class PlayerCareerTracker:
         trends = CareerTrends()
 
         if len(career.performance_history) >= 3:
-            perf = career.performance_history
-            trends.kd_trend = round(calculate_linear_trend([p.kd for p in perf]), 4)
-            trends.adr_trend = round(calculate_linear_trend([p.adr for p in perf]), 4)
-            trends.headshot_trend = round(calculate_linear_trend([p.headshot_pct for p in perf]), 4)
+            columns = career.performance_columns or build_performance_columns(career.performance_history)
+            trends.kd_trend = round(calculate_linear_trend(columns['kd']), 4)
+            trends.adr_trend = round(calculate_linear_trend(columns['adr']), 4)
+            trends.headshot_trend = round(calculate_linear_trend(columns['headshot_pct']), 4)
 
-            # Win rate trend (convert to 1/0)
-            win_values = [1 if p.result == 'WIN' else 0 for p in perf]
-            trends.win_rate_trend = round(calculate_linear_trend(win_values), 4)
+            # Win rate trend ('win' column is 1/0)
+            trends.win_rate_trend = round(calculate_linear_trend(columns['win']), 4)
 
         if len(career.sentiment_history) >= 3:
             sent = career.sentiment_history
@@ -483,51 +622,26 @@ class PlayerCareerTracker:
             return milestones
 
         perf = career.performance_history
+        columns = career.performance_columns or build_performance_columns(perf)
+
+        # Best/worst KD and highest kills (argmax/argmin pick the first match on ties)
+        best_kd_match = perf[int(np.argmax(columns['kd']))]
+        worst_kd_match = perf[int(np.argmin(columns['kd']))]
+        highest_kills = perf[int(np.argmax(columns['kills']))]
 
-        # Best/worst KD
-        best_kd_match = max(perf, key=lambda p: p.kd)
-        worst_kd_match = min(perf, key=lambda p: p.kd)
         milestones.best_kd_match = best_kd_match.match_id
         milestones.best_kd_value = best_kd_match.kd
         milestones.worst_kd_match = worst_kd_match.match_id
         milestones.worst_kd_value = worst_kd_match.kd
-
-        # Highest kills
-        highest_kills = max(perf, key=lambda p: p.kills)
         milestones.highest_kills_match = highest_kills.match_id
         milestones.highest_kills_value = highest_kills.kills
 
         # Streaks
-        current_streak = 0
-        current_type = ""
-        max_win_streak = 0
-        max_loss_streak = 0
-        temp_streak = 0
-        temp_type = ""
-
-        for p in perf:
-            if p.result == "WIN":
-                if temp_type == "WIN":
-                    temp_streak += 1
-                else:
-                    temp_streak = 1
-                    temp_type = "WIN"
-                max_win_streak = max(max_win_streak, temp_streak)
-            elif p.result == "LOSS":
-                if temp_type == "LOSS":
-                    temp_streak += 1
-                else:
-                    temp_streak = 1
-                    temp_type = "LOSS"
-                max_loss_streak = max(max_loss_streak, temp_streak)
-            else:
-                temp_streak = 0
-                temp_type = ""
-
+        max_win_streak, max_loss_streak, current_streak = calculate_streaks(columns['outcome'])
         milestones.longest_win_streak = max_win_streak
         milestones.longest_loss_streak = max_loss_streak
-        milestones.current_streak = temp_streak if temp_type == "WIN" else -temp_streak
-        milestones.current_streak_type = temp_type
+        milestones.current_streak = current_streak
+        milestones.current_streak_type = "WIN" if current_streak > 0 else "LOSS" if current_streak < 0 else ""
 
         # Most toxic match
         if career.sentiment_history:
@@ -543,6 +657,51 @@ class PlayerCareerTracker:
 
         return milestones
 
+    def _calculate_map_stats(self, career: PlayerCareer) -> Dict[str, Dict[str, Any]]:
+        """Calculate per-map statistics."""
+        map_stats = {}
+
+        if not career.performance_history:
+            return map_stats
+
+        columns = career.performance_columns or build_performance_columns(career.performance_history)
+
+        # Map codes in first-played order, then one weighted bincount per total
+        map_codes = {}
+        codes = np.fromiter(
+            (map_codes.setdefault(p.map, len(map_codes)) for p in career.performance_history),
+            dtype=np.int64,
+            count=len(career.performance_history)
+        )
+        n_maps = len(map_codes)
+        matches = np.bincount(codes, minlength=n_maps)
+        wins = np.bincount(codes, weights=columns['outcome'] == 1, minlength=n_maps)
+        losses = np.bincount(codes, weights=columns['outcome'] == -1, minlength=n_maps)
+        total_kills = np.bincount(codes, weights=columns['kills'], minlength=n_maps)
+        total_deaths = np.bincount(codes, weights=columns['deaths'], minlength=n_maps)
+        total_adr = np.bincount(codes, weights=columns['adr'], minlength=n_maps)
+
+        for map_name, code in map_codes.items():
+            map_stats[map_name] = {
+                'matches': int(matches[code]),
+                'wins': int(wins[code]),
+                'losses': int(losses[code]),
+                'total_kills': int(total_kills[code]),
+                'total_deaths': int(total_deaths[code]),
+                'total_adr': float(total_adr[code]),
+            }
+
+        # Calculate averages
+        for map_name, stats in map_stats.items():
+            n = stats['matches']
+            stats['avg_kills'] = round(stats['total_kills'] / n, 1)
+            stats['avg_deaths'] = round(stats['total_deaths'] / n, 1)
+            stats['avg_adr'] = round(stats['total_adr'] / n, 1)
+            stats['win_rate'] = round(stats['wins'] / n * 100, 1)
+            stats['kd'] = round(stats['total_kills'] / stats['total_deaths'], 2) if stats['total_deaths'] > 0 else stats['total_kills']
+
+        return map_stats
+
     def _calculate_recent_form(self, career: PlayerCareer, window: int = 5) -> RecentForm:
         """Compare recent performance to career average."""
         form = RecentForm(matches_analyzed=window)
@@ -562,7 +721,7 @@ class PlayerCareerTracker:
         form.career_kd = avg.kd
         form.kd_diff = round(form.recent_kd - form.career_kd, 2)
 
-        form.recent_adr = round(mean(p.adr for p in recent), 1)
+        form.recent_adr = round(math.fsum(p.adr for p in recent) / window, 1)
         form.career_adr = avg.adr
         form.adr_diff = round(form.recent_adr - form.career_adr, 1)
 
@@ -596,98 +755,209 @@ class PlayerCareerTracker:
 
         return form
 
-    def _calculate_map_stats(self, career: PlayerCareer) -> Dict[str, Dict[str, Any]]:
-        """Calculate per-map statistics."""
-        map_stats = {}
-
-        for perf in career.performance_history:
-            map_name = perf.map
-            if map_name not in map_stats:
-                map_stats[map_name] = {
-                    'matches': 0,
-                    'wins': 0,
-                    'losses': 0,
-                    'total_kills': 0,
-                    'total_deaths': 0,
-                    'total_adr': 0,
-                }
-
-            stats = map_stats[map_name]
-            stats['matches'] += 1
-            stats['total_kills'] += perf.kills
-            stats['total_deaths'] += perf.deaths
-            stats['total_adr'] += perf.adr
-
-            if perf.result == 'WIN':
-                stats['wins'] += 1
-            elif perf.result == 'LOSS':
-                stats['losses'] += 1
+    def get_all_players(self) -> List[str]:
+        """Get list of all player Steam IDs in the database."""
+        return [steam_id for steam_id in self._get_player_match_index() if steam_id]
 
-        # Calculate averages
-        for map_name, stats in map_stats.items():
-            n = stats['matches']
-            stats['avg_kills'] = round(stats['total_kills'] / n, 1)
-            stats['avg_deaths'] = round(stats['total_deaths'] / n, 1)
-            stats['avg_adr'] = round(stats['total_adr'] / n, 1)
-            stats['win_rate'] = round(stats['wins'] / n * 100, 1)
-            stats['kd'] = round(stats['total_kills'] / stats['total_deaths'], 2) if stats['total_deaths'] > 0 else stats['total_kills']
+    def _latest_match_id(self, steam_id: str) -> Optional[str]:
+        """ID of the match that ends the player's performance history."""
+        player_matches = self._get_player_match_index().get(steam_id, [])
+        if not player_matches:
+            return None
+        match_dates, _ = self._get_match_meta()
+        # Histories are stably sorted by date, so the last of the latest-dated matches ends it
+        _, latest = max(enumerate(player_matches),
+                        key=lambda item: (match_dates.get(item[1].get('match_id'), ''), item[0]))
+        return latest.get('match_id')
+
+    def load_saved_career(self, steam_id: str, path: str) -> Optional[PlayerCareer]:
+        """
+        Load a career saved by save_career_to_json if the player has played no
+        new matches since, otherwise None.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            career = load_career_from_json(path)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Could not load saved career {path}: {e}")
+            return None
+
+        player_matches = self._get_player_match_index().get(steam_id, [])
+        if career.total_matches != len(player_matches) or career.last_match_id != self._latest_match_id(steam_id):
+            return None
+        return career
 
-        return map_stats
+    def build_all_careers(
+        self,
+        workers: Optional[int] = None,
+        output_dir: Optional[str] = None,
+        force: bool = False
+    ) -> Dict[str, PlayerCareer]:
+        """
+        Build career profiles for all players.
 
-    def get_all_players(self) -> List[str]:
-        """Get list of all player Steam IDs in the database."""
-        player_matches = self.storage._read_table('player_matches')
-        return list(set(pm.get('steam_id') for pm in player_matches if pm.get('steam_id')))
+        With output_dir, each career is saved there as career_<steam_id>.json,
+        and players whose saved career already covers their latest match are
+        loaded instead of rebuilt (unless force is set).
+        """
+        steam_ids = self.get_all_players()
 
-    def build_all_careers(self) -> Dict[str, PlayerCareer]:
-        """Build career profiles for all players."""
         careers = {}
-        for steam_id in self.get_all_players():
-            careers[steam_id] = self.get_player_career(steam_id)
-        return careers
+        if output_dir and not force:
+            for steam_id in steam_ids:
+                saved = self.load_saved_career(steam_id, career_json_path(output_dir, steam_id))
+                if saved is not None:
+                    careers[steam_id] = saved
+
+        stale = [steam_id for steam_id in steam_ids if steam_id not in careers]
+        if output_dir:
+            logger.info(f"Building {len(stale)} careers, {len(careers)} saved careers are up to date")
+        careers.update(self._build_careers(stale, workers))
+
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            for steam_id in stale:
+                save_career_to_json(careers[steam_id], career_json_path(output_dir, steam_id))
+
+        return {steam_id: careers[steam_id] for steam_id in steam_ids}
+
+    def _build_careers(self, steam_ids: List[str], workers: Optional[int] = None) -> Dict[str, PlayerCareer]:
+        """
+        Build the careers of the given players.
+
+        Players are independent, so with FileStorage they are built across a
+        pool of worker processes (one per CPU unless workers is given). Each
+        worker keeps its own tracker, seeded with this tracker's match
+        metadata, for all the players it builds.
+        """
+        workers = workers or os.cpu_count() or 1
+
+        if workers <= 1 or len(steam_ids) <= 1 or type(self.storage) is not FileStorage:
+            return {steam_id: self.get_player_career(steam_id) for steam_id in steam_ids}
+
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(steam_ids)),
+            initializer=_init_career_worker,
+            initargs=(self.storage.tables_dir, tuple(self.storage.sharded_tables), self._get_match_meta()),
+        ) as executor:
+            return dict(zip(steam_ids, executor.map(_build_career_in_worker, steam_ids)))
+
+
+# Tracker of a build_all_careers worker process, set up by _init_career_worker
+_worker_tracker: Optional[PlayerCareerTracker] = None
+
+
+def _init_career_worker(tables_dir: str, sharded_tables: Tuple[str, ...], match_meta: Tuple[Dict[str, str], Dict[str, str]]):
+    """Create the worker process's tracker over the parent's tables."""
+    global _worker_tracker
+    _worker_tracker = PlayerCareerTracker(FileStorage(tables_dir, sharded_tables=sharded_tables))
+    _worker_tracker._match_meta_cache = match_meta
+
+
+def _build_career_in_worker(steam_id: str) -> PlayerCareer:
+    """Build one player's career in a build_all_careers worker process."""
+    return _worker_tracker.get_player_career(steam_id)
 
 
 # =============================================================================
 # STORAGE
 # =============================================================================
 
+def _shallow_asdict(obj) -> Dict[str, Any]:
+    """
+    Dict of a flat dataclass's fields. Unlike dataclasses.asdict, field values
+    are not recursed into or copied.
+    """
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
+
+def career_json_path(output_dir: str, steam_id: str) -> str:
+    """Path of a player's saved career in output_dir."""
+    return os.path.join(output_dir, f"career_{steam_id}.json")
+
+
 def save_career_to_json(career: PlayerCareer, output_path: str):
     """Save a player career to JSON file."""
+    # orjson encodes dataclasses natively, so they are only converted to
+    # dicts for the stdlib encoder
+    as_record = (lambda obj: obj) if ORJSON_AVAILABLE else _shallow_asdict
     data = {
         'steam_id': career.steam_id,
         'player_name': career.player_name,
         'first_match_date': career.first_match_date,
         'last_match_date': career.last_match_date,
         'total_matches': career.total_matches,
-        'career_avg': asdict(career.career_avg),
-        'trends': asdict(career.trends),
-        'milestones': asdict(career.milestones),
-        'recent_form': asdict(career.recent_form),
+        'last_match_id': career.last_match_id,
+        'career_avg': as_record(career.career_avg),
+        'trends': as_record(career.trends),
+        'milestones': as_record(career.milestones),
+        'recent_form': as_record(career.recent_form),
         'map_stats': career.map_stats,
-        'performance_history': [asdict(p) for p in career.performance_history],
-        'sentiment_history': [asdict(s) for s in career.sentiment_history],
-        'flash_history': [asdict(f) for f in career.flash_history],
+        'performance_history': [as_record(p) for p in career.performance_history],
+        'sentiment_history': [as_record(s) for s in career.sentiment_history],
+        'flash_history': [as_record(f) for f in career.flash_history],
     }
 
-    with open(output_path, 'w') as f:
-        json.dump(data, f, indent=2)
+    if ORJSON_AVAILABLE:
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_path, 'w') as f:
+            json.dump(data, f, indent=2)
 
     logger.info(f"Saved career to {output_path}")
 
 
+def load_career_from_json(path: str) -> PlayerCareer:
+    """Load a player career saved by save_career_to_json."""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+    career = PlayerCareer(
+        steam_id=data['steam_id'],
+        player_name=data['player_name'],
+        first_match_date=data.get('first_match_date'),
+        last_match_date=data.get('last_match_date'),
+        total_matches=data.get('total_matches', 0),
+        last_match_id=data.get('last_match_id'),
+        performance_history=[MatchPerformance(**p) for p in data.get('performance_history', [])],
+        sentiment_history=[MatchSentiment(**s) for s in data.get('sentiment_history', [])],
+        flash_history=[MatchFlashStats(**f) for f in data.get('flash_history', [])],
+        trends=CareerTrends(**data.get('trends', {})),
+        career_avg=CareerAverages(**data.get('career_avg', {})),
+        milestones=CareerMilestones(**data.get('milestones', {})),
+        recent_form=RecentForm(**data.get('recent_form', {})),
+        map_stats=data.get('map_stats', {}),
+    )
+    career.performance_columns = build_performance_columns(career.performance_history)
+    return career
+
+
 # =============================================================================
 # CLI
 # =============================================================================
 
 if __name__ == "__main__":
-    import sys
-
     logging.basicConfig(level=logging.INFO)
 
     tracker = PlayerCareerTracker()
 
-    if len(sys.argv) > 1:
-        steam_id = sys.argv[1]
+    # --force rebuilds careers even if their saved JSON is up to date
+    force = '--force' in sys.argv
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+
+    if '--all' in sys.argv:
+        careers = tracker.build_all_careers(output_dir='.', force=force)
+        print(f"Built {len(careers)} careers")
+        sys.exit(0)
+
+    if args:
+        steam_id = args[0]
     else:
         # Get first player
         players = tracker.get_all_players()
@@ -698,7 +968,11 @@ if __name__ == "__main__":
 
     print(f"\nBuilding career profile for: {steam_id}\n")
 
-    career = tracker.get_player_career(steam_id)
+    output_path = career_json_path('.', steam_id)
+    career = None if force else tracker.load_saved_career(steam_id, output_path)
+    if career is None:
+        career = tracker.get_player_career(steam_id)
+        save_career_to_json(career, output_path)
 
     print(f"Player: {career.player_name}")
     print(f"Total Matches: {career.total_matches}")
@@ -736,7 +1010,4 @@ if __name__ == "__main__":
     for map_name, stats in career.map_stats.items():
         print(f"{map_name}: {stats['matches']} matches, {stats['win_rate']}% WR, {stats['kd']} K/D")
 
-    # Save to file
-    output_path = f"./career_{steam_id}.json"
-    save_career_to_json(career, output_path)
     print(f"\nSaved to: {output_path}")
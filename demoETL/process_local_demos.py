@@ -3,16 +3,21 @@ Process Local Demos
 ====================
 Processes all .dem files from the demos/ folder and stores them in local JSON tables.
 
+Demos already in the matches table are skipped; pass --force to re-parse them.
+
 Usage:
-    python demoETL/process_local_demos.py
+    python demoETL/process_local_demos.py [--force]
 """
 
 import os
 import sys
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import List, Optional, Set, Tuple
 from demoparser2 import DemoParser
 from file_stats_inserter import FileStatsInserter
+from file_storage import DeferredStorage, FileStorage
 
 # Configure logging
 logging.basicConfig(
@@ -21,18 +26,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# demo_file names of the matches already stored, read on first use
+_processed_demo_files: Optional[Set[str]] = None
+
+
+def is_demo_processed(demo_filename: str, storage: Optional[FileStorage] = None) -> bool:
+    """Whether a demo file is already in the matches table."""
+    global _processed_demo_files
+    if _processed_demo_files is None:
+        storage = storage or FileStorage()
+        _processed_demo_files = {m.get('demo_file') for m in storage.get_all_matches()}
+    return demo_filename in _processed_demo_files
+
 
-def process_demo(demo_path: str) -> bool:
+def process_demo(demo_path: str, storage: Optional[FileStorage] = None, force: bool = False) -> bool:
     """
     Process a single demo file and store in local tables.
 
     Args:
         demo_path: Full path to the .dem file
+        storage: Storage to write to (default: the local tables)
+        force: Re-parse the demo even if it was already processed
 
     Returns:
-        True if successful, False otherwise
+        True if successful (or already processed), False otherwise
     """
     demo_filename = os.path.basename(demo_path)
+    if not force and is_demo_processed(demo_filename, storage):
+        logger.info(f"Skipping already-processed demo: {demo_filename}")
+        return True
+
     logger.info(f"Processing demo: {demo_filename}")
 
     try:
@@ -43,7 +66,8 @@ def process_demo(demo_path: str) -> bool:
         inserter = FileStatsInserter(
             parser=parser,
             demo_filename=demo_filename,
-            demo_path=demo_path
+            demo_path=demo_path,
+            storage=storage
         )
 
         # Insert all data
@@ -72,6 +96,8 @@ def process_demo(demo_path: str) -> bool:
         inserter.insert_chat_messages()
 
         logger.info(f"✓ Successfully processed: {demo_filename}")
+        if _processed_demo_files is not None:
+            _processed_demo_files.add(demo_filename)
         return True
 
     except Exception as e:
@@ -79,8 +105,24 @@ def process_demo(demo_path: str) -> bool:
         return False
 
 
-def main():
-    """Main processing function."""
+def _process_demo_in_worker(demo_path: str) -> Tuple[bool, List[tuple]]:
+    """
+    Parse a demo in a worker process. Table writes are recorded rather than
+    performed, so only the parent process touches the table files. Already
+    processed demos are filtered out by main() before they get here.
+    """
+    storage = DeferredStorage()
+    success = process_demo(demo_path, storage, force=True)
+    return success, storage.writes
+
+
+def main(workers: Optional[int] = None, force: bool = False):
+    """
+    Main processing function. Demos are parsed in parallel across worker
+    processes (one per CPU unless workers is given); their table writes are
+    applied here, one demo at a time. Demos already in the matches table are
+    skipped unless force is set.
+    """
     # Get project root and demos directory
     project_root = Path(__file__).parent.parent
     demos_dir = project_root / "demos"
@@ -96,6 +138,20 @@ def main():
         logger.warning(f"No .dem files found in {demos_dir}")
         sys.exit(0)
 
+    storage = FileStorage()
+
+    skipped = 0
+    if not force:
+        new_demo_files = [p for p in demo_files if not is_demo_processed(p.name, storage)]
+        skipped = len(demo_files) - len(new_demo_files)
+        demo_files = new_demo_files
+        if skipped:
+            logger.info(f"Skipping {skipped} already-processed demo(s), use --force to re-parse them")
+
+    if not demo_files:
+        logger.info("No new demos to process")
+        return
+
     logger.info(f"Found {len(demo_files)} demo file(s) to process")
     logger.info("=" * 60)
 
@@ -103,18 +159,25 @@ def main():
     successful = 0
     failed = 0
 
-    for demo_path in demo_files:
-        if process_demo(str(demo_path)):
-            successful += 1
-        else:
-            failed += 1
-        logger.info("-" * 60)
+    workers = min(workers or os.cpu_count() or 1, len(demo_files))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_process_demo_in_worker, (str(p) for p in demo_files))
+        for success, writes in results:
+            # Partial writes of a failed demo are kept, as with in-process runs
+            with storage.transaction():
+                storage.replay(writes)
+            if success:
+                successful += 1
+            else:
+                failed += 1
+            logger.info("-" * 60)
 
     # Summary
     logger.info("=" * 60)
     logger.info(f"Processing complete!")
     logger.info(f"  Successful: {successful}")
     logger.info(f"  Failed: {failed}")
+    logger.info(f"  Skipped: {skipped}")
     logger.info(f"  Total: {len(demo_files)}")
 
     # Show where data was stored
@@ -130,4 +193,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(force='--force' in sys.argv)
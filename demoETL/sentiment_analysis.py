@@ -6,8 +6,13 @@ Analyzes voice communications from CS2 demos using AWS services.
 Pipeline:
     WAV file → Amazon Transcribe (speech-to-text) → Amazon Comprehend (sentiment)
 
+Speech can instead be transcribed locally with faster-whisper, which skips
+the S3 upload, the Transcribe job and the transcript download:
+    WAV file → faster-whisper (speech-to-text) → Amazon Comprehend (sentiment)
+
 Requirements:
     pip install boto3
+    pip install faster-whisper  (optional, for local transcription)
 
 AWS Setup:
     - Configure AWS credentials (aws configure or environment variables)
@@ -23,6 +28,9 @@ Usage:
 
     analyzer = VoiceSentimentAnalyzer(s3_bucket="your-bucket")
     results = analyzer.analyze_match_voice("match_id", "/path/to/voice_output/")
+
+    # Local transcription, no S3 bucket needed
+    analyzer = VoiceSentimentAnalyzer(s3_bucket=None, transcriber="whisper")
 """
 
 import os
@@ -31,8 +39,9 @@ import wave
 import struct
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterator, Tuple, Union
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -40,12 +49,52 @@ logger = logging.getLogger(__name__)
 # AWS imports - wrapped in try/except for environments without boto3
 try:
     import boto3
+    from botocore.config import Config
     from botocore.exceptions import ClientError
     AWS_AVAILABLE = True
 except ImportError:
     AWS_AVAILABLE = False
     logger.warning("boto3 not installed. AWS features disabled.")
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+    logger.info("requests not installed. Transcripts will be downloaded with urllib.")
+
+try:
+    from faster_whisper import WhisperModel
+    WHISPER_AVAILABLE = True
+except ImportError:
+    WHISPER_AVAILABLE = False
+    logger.info("faster-whisper not installed. Voice will be transcribed with Amazon Transcribe only.")
+
+# Players of a match analyzed at once; each one mostly waits on S3,
+# Transcribe and Comprehend, so they run on threads
+MAX_PLAYER_WORKERS = 10
+
+# HTTP connections each AWS client keeps open for reuse (botocore's default is
+# 10, fewer than the threads of a match analysis can use at once)
+AWS_MAX_POOL_CONNECTIONS = 50
+
+
+def aws_client_config() -> 'Config':
+    """Client config shared by the S3, Transcribe and Comprehend clients."""
+    return Config(
+        max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        retries={'mode': 'adaptive'}
+    )
+
+
+# Session reused for every transcript download, so results from the same
+# Transcribe host share kept-alive TLS connections (requests asks for gzip)
+if REQUESTS_AVAILABLE:
+    _http = requests.Session()
+    _http.mount('https://', HTTPAdapter(pool_connections=MAX_PLAYER_WORKERS, pool_maxsize=MAX_PLAYER_WORKERS))
+
 
 # =============================================================================
 # WAV FILE PARSING
@@ -182,14 +231,22 @@ class MatchVoiceSentimentSummary:
 class TranscribeClient:
     """Wrapper for Amazon Transcribe speech-to-text."""
 
-    def __init__(self, s3_bucket: str, region: str = "us-east-1"):
+    def __init__(
+        self,
+        s3_bucket: str,
+        region: str = "us-east-1",
+        session: Optional['boto3.session.Session'] = None,
+        config: Optional['Config'] = None
+    ):
         if not AWS_AVAILABLE:
             raise RuntimeError("boto3 is required for AWS integration")
 
         self.s3_bucket = s3_bucket
         self.region = region
-        self.s3_client = boto3.client('s3', region_name=region)
-        self.transcribe_client = boto3.client('transcribe', region_name=region)
+        session = session or boto3.session.Session()
+        config = config or aws_client_config()
+        self.s3_client = session.client('s3', region_name=region, config=config)
+        self.transcribe_client = session.client('transcribe', region_name=region, config=config)
 
     def upload_to_s3(self, local_path: str, s3_key: str) -> str:
         """Upload a file to S3 and return the S3 URI."""
@@ -219,37 +276,92 @@ class TranscribeClient:
             logger.error(f"Failed to start transcription: {e}")
             raise
 
-    def wait_for_transcription(
+    def download_transcript(self, transcript_uri: str) -> Dict[str, Any]:
+        """Download and parse the transcript JSON of a completed job."""
+        if REQUESTS_AVAILABLE:
+            response = _http.get(transcript_uri, timeout=60)
+            response.raise_for_status()
+            return response.json()
+
+        import urllib.request
+        with urllib.request.urlopen(transcript_uri) as resp:
+            return json.loads(resp.read().decode())
+
+    def wait_for_many(
         self,
-        job_name: str,
+        job_names: List[str],
         poll_interval: int = 5,
         timeout: int = 300
-    ) -> Dict[str, Any]:
-        """Wait for transcription job to complete and return results."""
+    ) -> Iterator[Tuple[str, Union[Dict[str, Any], Exception]]]:
+        """
+        Wait for several transcription jobs at once, yielding (job_name, result)
+        as each one finishes. Every pending job is polled each round, and the
+        sleep is skipped after a round in which a job finished. A job that
+        fails or times out yields the exception instead of a result.
+        """
         start_time = time.time()
+        pending = list(job_names)
 
-        while True:
+        while pending:
             if time.time() - start_time > timeout:
-                raise TimeoutError(f"Transcription job {job_name} timed out")
+                for job_name in pending:
+                    yield job_name, TimeoutError(f"Transcription job {job_name} timed out")
+                return
+
+            finished = []
+            for job_name in pending:
+                try:
+                    response = self.transcribe_client.get_transcription_job(
+                        TranscriptionJobName=job_name
+                    )
+                    status = response['TranscriptionJob']['TranscriptionJobStatus']
+
+                    if status == 'COMPLETED':
+                        # Fetch the transcript from the result URL
+                        transcript_uri = response['TranscriptionJob']['Transcript']['TranscriptFileUri']
+                        result = self.download_transcript(transcript_uri)
+                    elif status == 'FAILED':
+                        reason = response['TranscriptionJob'].get('FailureReason', 'Unknown')
+                        result = RuntimeError(f"Transcription failed: {reason}")
+                    else:
+                        continue
+                except Exception as e:
+                    result = e
+
+                finished.append(job_name)
+                yield job_name, result
+
+            pending = [job_name for job_name in pending if job_name not in finished]
+            if pending and not finished:
+                time.sleep(poll_interval)
 
-            response = self.transcribe_client.get_transcription_job(
-                TranscriptionJobName=job_name
-            )
-            status = response['TranscriptionJob']['TranscriptionJobStatus']
+    def wait_for_transcription(
+        self,
+        job_name: str,
+        poll_interval: int = 5,
+        timeout: int = 300
+    ) -> Dict[str, Any]:
+        """Wait for transcription job to complete and return results."""
+        for _, result in self.wait_for_many([job_name], poll_interval, timeout):
+            if isinstance(result, Exception):
+                raise result
+            return result
 
-            if status == 'COMPLETED':
-                # Fetch the transcript from the result URL
-                transcript_uri = response['TranscriptionJob']['Transcript']['TranscriptFileUri']
-                # Download and parse the transcript JSON
-                import urllib.request
-                with urllib.request.urlopen(transcript_uri) as resp:
-                    return json.loads(resp.read().decode())
+    def start_wav_transcription(
+        self,
+        wav_path: str,
+        job_prefix: str = "stattrak"
+    ) -> str:
+        """Upload a WAV file and start its transcription job. Returns the job name."""
+        filename = os.path.basename(wav_path)
+        job_name = f"{job_prefix}-{int(time.time())}-{filename.replace('.wav', '')}"
+        s3_key = f"voice-input/{job_name}.wav"
 
-            elif status == 'FAILED':
-                reason = response['TranscriptionJob'].get('FailureReason', 'Unknown')
-                raise RuntimeError(f"Transcription failed: {reason}")
+        # Upload to S3
+        s3_uri = self.upload_to_s3(wav_path, s3_key)
 
-            time.sleep(poll_interval)
+        # Start transcription
+        return self.start_transcription(job_name, s3_uri)
 
     def transcribe_wav(
         self,
@@ -261,20 +373,10 @@ class TranscribeClient:
 
         Returns the full Transcribe result including segments with timestamps.
         """
-        filename = os.path.basename(wav_path)
-        job_name = f"{job_prefix}-{int(time.time())}-{filename.replace('.wav', '')}"
-        s3_key = f"voice-input/{job_name}.wav"
-
-        # Upload to S3
-        s3_uri = self.upload_to_s3(wav_path, s3_key)
-
-        # Start transcription
-        self.start_transcription(job_name, s3_uri)
+        job_name = self.start_wav_transcription(wav_path, job_prefix)
 
         # Wait for completion
-        result = self.wait_for_transcription(job_name)
-
-        return result
+        return self.wait_for_transcription(job_name)
 
     def parse_transcript_result(self, result: Dict[str, Any]) -> tuple[str, List[TranscriptSegment]]:
         """Parse Transcribe result into transcript text and segments."""
@@ -299,6 +401,54 @@ class TranscribeClient:
         return full_text, segments
 
 
+# =============================================================================
+# LOCAL WHISPER TRANSCRIPTION
+# =============================================================================
+
+class WhisperTranscriber:
+    """
+    Local speech-to-text with faster-whisper, a drop-in for TranscribeClient's
+    transcribe_wav/parse_transcript_result. The model is loaded once and its
+    int8 weights run on CPU (or GPU when available).
+    """
+
+    def __init__(
+        self,
+        model_size: str = "base",
+        language_code: str = "en-US",
+        num_workers: int = MAX_PLAYER_WORKERS
+    ):
+        if not WHISPER_AVAILABLE:
+            raise RuntimeError("faster-whisper is required for local transcription")
+
+        self.language = language_code.split('-')[0]
+        # num_workers lets several threads transcribe with the one model at once
+        self.model = WhisperModel(model_size, device="auto", compute_type="int8", num_workers=num_workers)
+
+    def transcribe_wav(self, wav_path: str) -> Dict[str, Any]:
+        """
+        Transcribe a WAV file. The result uses the layout of an Amazon
+        Transcribe result, so it parses with parse_transcript_result.
+        """
+        segments, _ = self.model.transcribe(wav_path, language=self.language, word_timestamps=True)
+
+        texts = []
+        items = []
+        for segment in segments:
+            texts.append(segment.text.strip())
+            for word in segment.words or []:
+                items.append({
+                    'type': 'pronunciation',
+                    'start_time': str(word.start),
+                    'end_time': str(word.end),
+                    'alternatives': [{'content': word.word.strip(), 'confidence': str(word.probability)}]
+                })
+
+        return {'results': {'transcripts': [{'transcript': ' '.join(t for t in texts if t)}], 'items': items}}
+
+    parse_transcript_result = TranscribeClient.parse_transcript_result
+
+
 # =============================================================================
 # AWS COMPREHEND INTEGRATION
 # =============================================================================
@@ -306,12 +456,19 @@ class TranscribeClient:
 class ComprehendClient:
     """Wrapper for Amazon Comprehend sentiment analysis."""
 
-    def __init__(self, region: str = "us-east-1"):
+    def __init__(
+        self,
+        region: str = "us-east-1",
+        session: Optional['boto3.session.Session'] = None,
+        config: Optional['Config'] = None
+    ):
         if not AWS_AVAILABLE:
             raise RuntimeError("boto3 is required for AWS integration")
 
         self.region = region
-        self.comprehend_client = boto3.client('comprehend', region_name=region)
+        session = session or boto3.session.Session()
+        config = config or aws_client_config()
+        self.comprehend_client = session.client('comprehend', region_name=region, config=config)
 
     def analyze_sentiment(self, text: str, language: str = "en") -> SentimentScore:
         """
@@ -354,7 +511,8 @@ class ComprehendClient:
         """
         Analyze sentiment of multiple texts in batch.
 
-        AWS Comprehend supports up to 25 texts per batch.
+        AWS Comprehend supports up to 25 texts per batch. Texts the batch
+        call reports as errors are retried one at a time.
         """
         results = []
         batch_size = 25
@@ -370,20 +528,26 @@ class ComprehendClient:
                     LanguageCode=language
                 )
 
+                # Results carry the index of their text; failed texts are
+                # left out of ResultList and listed in ErrorList instead
+                batch_results = [None] * len(batch)
                 for result in response['ResultList']:
                     scores = result['SentimentScore']
-                    results.append(SentimentScore(
+                    batch_results[result['Index']] = SentimentScore(
                         positive=scores['Positive'],
                         negative=scores['Negative'],
                         neutral=scores['Neutral'],
                         mixed=scores['Mixed'],
                         dominant=result['Sentiment']
-                    ))
+                    )
 
             except ClientError as e:
                 logger.error(f"Batch comprehend error: {e}")
                 raise
 
+            for j, score in enumerate(batch_results):
+                results.append(score if score is not None else self.analyze_sentiment(batch[j], language))
+
         return results
 
 
@@ -405,52 +569,80 @@ class VoiceSentimentAnalyzer:
 
     def __init__(
         self,
-        s3_bucket: str,
+        s3_bucket: Optional[str],
         region: str = "us-east-1",
-        language_code: str = "en-US"
+        language_code: str = "en-US",
+        transcriber: str = "aws",
+        whisper_model: str = "base"
     ):
+        """
+        Args:
+            transcriber: "aws" for Amazon Transcribe (needs s3_bucket) or
+                "whisper" for local faster-whisper transcription
+            whisper_model: faster-whisper model size, used with "whisper"
+        """
         self.s3_bucket = s3_bucket
         self.region = region
         self.language_code = language_code
 
         if AWS_AVAILABLE:
-            self.transcribe = TranscribeClient(s3_bucket, region)
-            self.comprehend = ComprehendClient(region)
+            # One session and client config for all three clients, whose
+            # connection pools are then reused across every call
+            self.session = boto3.session.Session()
+            self.client_config = aws_client_config()
+            self.comprehend = ComprehendClient(region, self.session, self.client_config)
         else:
-            self.transcribe = None
             self.comprehend = None
 
+        if transcriber == "whisper":
+            self.transcribe = WhisperTranscriber(whisper_model, language_code)
+        elif AWS_AVAILABLE:
+            self.transcribe = TranscribeClient(s3_bucket, region, self.session, self.client_config)
+        else:
+            self.transcribe = None
+
     def analyze_player_voice(
         self,
         match_id: str,
-        wav_metadata: WavMetadata
+        wav_metadata: WavMetadata,
+        transcribe_result: Optional[Dict[str, Any]] = None
     ) -> PlayerVoiceSentiment:
-        """Analyze a single player's voice file."""
+        """
+        Analyze a single player's voice file. The file is transcribed first
+        unless its finished Transcribe result is passed in.
+        """
         from datetime import datetime
 
         logger.info(f"Analyzing voice for player {wav_metadata.steam_id}")
 
         # Transcribe speech to text
-        transcribe_result = self.transcribe.transcribe_wav(wav_metadata.file_path)
+        if transcribe_result is None:
+            transcribe_result = self.transcribe.transcribe_wav(wav_metadata.file_path)
         transcript, segments = self.transcribe.parse_transcript_result(transcribe_result)
 
-        # Analyze overall sentiment
-        overall_sentiment = self.comprehend.analyze_sentiment(transcript)
-
-        # Analyze per-segment sentiment (group into chunks for context)
-        segment_sentiments = []
+        # Per-segment chunks (group words for context)
         chunk_size = 10  # Analyze every 10 words together
         words = transcript.split()
-
-        for i in range(0, len(words), chunk_size):
-            chunk = ' '.join(words[i:i + chunk_size])
-            if chunk.strip():
-                sentiment = self.comprehend.analyze_sentiment(chunk)
-                segment_sentiments.append({
-                    'text': chunk,
-                    'word_index': i,
-                    'sentiment': asdict(sentiment)
-                })
+        chunk_starts = list(range(0, len(words), chunk_size))
+        chunks = [' '.join(words[i:i + chunk_size]) for i in chunk_starts]
+
+        # Score the whole transcript and every chunk in batched Comprehend
+        # calls; an empty transcript has no chunks and stays neutral
+        if transcript.strip():
+            sentiments = self.comprehend.batch_analyze_sentiment([transcript] + chunks)
+            overall_sentiment = sentiments[0]
+        else:
+            sentiments = []
+            overall_sentiment = self.comprehend.analyze_sentiment(transcript)
+
+        segment_sentiments = [
+            {
+                'text': chunk,
+                'word_index': i,
+                'sentiment': asdict(sentiment)
+            }
+            for i, chunk, sentiment in zip(chunk_starts, chunks, sentiments[1:])
+        ]
 
         return PlayerVoiceSentiment(
             match_id=match_id,
@@ -497,12 +689,41 @@ class VoiceSentimentAnalyzer:
                 analyzed_at=datetime.utcnow().isoformat()
             )
 
-        # Analyze each player
+        # Analyze the players concurrently (boto3 clients are safe to share
+        # between threads)
+        futures = {}
+        with ThreadPoolExecutor(max_workers=min(len(wav_files), MAX_PLAYER_WORKERS)) as executor:
+            if not isinstance(self.transcribe, TranscribeClient):
+                # Local transcription has no jobs to wait on
+                for wav_meta in wav_files:
+                    futures[wav_meta.file_path] = executor.submit(self.analyze_player_voice, match_id, wav_meta)
+            else:
+                # Start every player's transcription job, wait for them all in
+                # one polling loop, and analyze each transcript as soon as its
+                # job finishes
+                start_futures = [executor.submit(self.transcribe.start_wav_transcription, wav_meta.file_path)
+                                 for wav_meta in wav_files]
+                jobs = {}
+                for wav_meta, future in zip(wav_files, start_futures):
+                    try:
+                        jobs[future.result()] = wav_meta
+                    except Exception as e:
+                        logger.error(f"Failed to analyze {wav_meta.filename}: {e}")
+
+                for job_name, result in self.transcribe.wait_for_many(list(jobs)):
+                    wav_meta = jobs[job_name]
+                    if isinstance(result, Exception):
+                        logger.error(f"Failed to analyze {wav_meta.filename}: {result}")
+                        continue
+                    futures[wav_meta.file_path] = executor.submit(self.analyze_player_voice, match_id, wav_meta, result)
+
         player_sentiments = []
         for wav_meta in wav_files:
+            future = futures.get(wav_meta.file_path)
+            if future is None:
+                continue
             try:
-                sentiment = self.analyze_player_voice(match_id, wav_meta)
-                player_sentiments.append(sentiment)
+                player_sentiments.append(future.result())
             except Exception as e:
                 logger.error(f"Failed to analyze {wav_meta.filename}: {e}")
 
@@ -590,17 +811,21 @@ if __name__ == "__main__":
 
     logging.basicConfig(level=logging.INFO)
 
-    if len(sys.argv) < 3:
-        print("Usage: python sentiment_analysis.py <match_id> <voice_dir> [s3_bucket]")
+    # --whisper transcribes locally with faster-whisper instead of Amazon Transcribe
+    use_whisper = '--whisper' in sys.argv
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+
+    if len(args) < 2:
+        print("Usage: python sentiment_analysis.py <match_id> <voice_dir> [s3_bucket] [--whisper]")
         print("Example: python sentiment_analysis.py abc123 ./tables/voice_output/abc123/ my-bucket")
         sys.exit(1)
 
-    match_id = sys.argv[1]
-    voice_dir = sys.argv[2]
-    s3_bucket = sys.argv[3] if len(sys.argv) > 3 else None
+    match_id = args[0]
+    voice_dir = args[1]
+    s3_bucket = args[2] if len(args) > 2 else None
 
-    # If no S3 bucket, just parse WAV metadata
-    if not s3_bucket:
+    # If no S3 bucket (and no local transcription), just parse WAV metadata
+    if not s3_bucket and not use_whisper:
         print(f"\nParsing WAV files in {voice_dir}...")
         wav_files = get_wav_files_for_match(voice_dir)
 
@@ -617,7 +842,7 @@ if __name__ == "__main__":
                 print()
     else:
         # Full analysis with AWS
-        analyzer = VoiceSentimentAnalyzer(s3_bucket=s3_bucket)
+        analyzer = VoiceSentimentAnalyzer(s3_bucket=s3_bucket, transcriber="whisper" if use_whisper else "aws")
         results = analyzer.analyze_match_voice(match_id, voice_dir)
 
         output_path = f"./sentiment_{match_id}.json"
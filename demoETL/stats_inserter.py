@@ -20,6 +20,8 @@ import hashlib
 import logging as logger
 from datetime import datetime
 from typing import Optional
+import numpy as np
+import pandas as pd
 from demoparser2 import DemoParser
 from db_utils import Connect
 
@@ -399,20 +401,20 @@ class StatsInserter:
             logger.warning("No kill data to insert")
             return
 
-        # Create tick-to-round mapping
-        round_ticks = []
-        for _, row in rounds_df.iterrows():
-            round_ticks.append((int(row.get('round', 0)), int(row.get('tick', 0))))
-        round_ticks.sort(key=lambda x: x[1])
-
-        def get_round_for_tick(tick):
-            """Find which round a tick belongs to."""
-            current_round = 1
-            for round_num, round_tick in round_ticks:
-                if tick < round_tick:
-                    return current_round
-                current_round = round_num
-            return current_round
+        def column(df, name):
+            if name in df.columns:
+                return df[name].to_numpy(np.int64)
+            return np.zeros(len(df), np.int64)
+
+        # Tick-to-round mapping: a kill takes the round number of the last
+        # round_end at or before its tick, or round 1 before the first one
+        round_end_ticks = column(rounds_df, 'tick')
+        order = np.argsort(round_end_ticks, kind='stable')
+        round_end_ticks = round_end_ticks[order]
+        round_nums = np.concatenate(([1], column(rounds_df, 'round')[order]))
+
+        kill_ticks = column(kills_df, 'tick')
+        kill_rounds = round_nums[np.searchsorted(round_end_ticks, kill_ticks, 'right')]
 
         sql = """
             INSERT INTO stats.kills (
@@ -431,28 +433,47 @@ class StatsInserter:
             );
         """
 
-        for _, kill in kills_df.iterrows():
-            tick = int(kill.get('tick', 0))
-
+        def steam_ids(name):
+            if name in kills_df.columns:
+                return kills_df[name].fillna('').astype(str).to_numpy(object)
+            return np.full(len(kills_df), '', dtype=object)
+
+        def flags(name):
+            if name in kills_df.columns:
+                return (kills_df[name].notna() & kills_df[name].astype(bool)).to_numpy()
+            return np.zeros(len(kills_df), dtype=bool)
+
+        def values(name):
+            if name in kills_df.columns:
+                return kills_df[name].to_numpy(object)
+            return np.full(len(kills_df), None, dtype=object)
+
+        # Coerce every column once up front so the row loop is field access only
+        assister_ids = steam_ids('assister_steamid')
+        kill_rows = pd.DataFrame({
+            'attacker_steam_id': steam_ids('attacker_steamid'),
+            'attacker_name': values('attacker_name'),
+            'attacker_team': None,  # Would need additional parsing
+            'victim_steam_id': steam_ids('user_steamid'),
+            'victim_name': values('user_name'),
+            'victim_team': None,
+            'weapon': values('weapon'),
+            'headshot': flags('headshot'),
+            'wallbang': flags('penetrated'),
+            'through_smoke': flags('thrusmoke'),
+            'no_scope': flags('noscope'),
+            'attacker_blind': flags('attackerblind'),
+            'assister_steam_id': pd.Series(np.where(assister_ids != '', assister_ids, None), dtype=object),
+            'assister_name': values('assister_name'),
+            'flash_assist': flags('assistedflash')
+        }).to_dict('records')
+
+        for kill, tick, round_number in zip(kill_rows, kill_ticks.tolist(), kill_rounds.tolist()):
             params = {
                 'match_id': self.match_id,
-                'round_number': get_round_for_tick(tick),
+                'round_number': round_number,
                 'tick': tick,
-                'attacker_steam_id': str(kill.get('attacker_steamid', '')),
-                'attacker_name': kill.get('attacker_name'),
-                'attacker_team': None,  # Would need additional parsing
-                'victim_steam_id': str(kill.get('user_steamid', '')),
-                'victim_name': kill.get('user_name'),
-                'victim_team': None,
-                'weapon': kill.get('weapon'),
-                'headshot': bool(kill.get('headshot', False)),
-                'wallbang': bool(kill.get('penetrated', False)),
-                'through_smoke': bool(kill.get('thrusmoke', False)),
-                'no_scope': bool(kill.get('noscope', False)),
-                'attacker_blind': bool(kill.get('attackerblind', False)),
-                'assister_steam_id': str(kill.get('assister_steamid', '')) if kill.get('assister_steamid') else None,
-                'assister_name': kill.get('assister_name'),
-                'flash_assist': bool(kill.get('assistedflash', False))
+                **kill
             }
 
             try: